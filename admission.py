@@ -0,0 +1,174 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from config import get_setting
+
+
+# Raised when a submission cannot be admitted: the queue is full, the wait took too
+# long or a rate limit was hit. retry_after is a hint in seconds.
+class Overloaded(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# The applicant's email address or session used up its submissions for now
+class RateLimited(Overloaded):
+    pass
+
+
+# `burst` tokens, refilled at `rate` tokens per second
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Seconds until a token is available (0 if one is available now)
+    def wait_time(self, now):
+        self.refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+# Token buckets per key (an email address, a session id), created on first use.
+# Full buckets carry no information and are dropped once there are many of them.
+class RateLimiter:
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = {}
+
+    def bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self.prune()
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def prune(self):
+        now = time.monotonic()
+        for key, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.burst:
+                del self._buckets[key]
+
+
+# Admission control for the heavy part of Submit (DOCX rendering, spooling the emails).
+# At most `max_concurrent` submissions run at once; the others wait in a FIFO queue of
+# at most `max_queue` for up to `queue_timeout` seconds, and are told their position
+# while they wait. Each email address and each session also has a token bucket, so
+# repeated submissions are turned away before they take a place in the queue.
+class AdmissionController:
+    def __init__(self, max_concurrent=4, max_queue=50, queue_timeout=30.0,
+                 email_rate=6 / 3600, email_burst=3, session_rate=6 / 3600, session_burst=3):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.limiters = {
+            "email": RateLimiter(email_rate, email_burst),
+            "session": RateLimiter(session_rate, session_burst),
+        }
+        self._cond = threading.Condition()
+        self._running = 0
+        self._queue = []  # Tickets in arrival order
+        self._tickets = itertools.count()
+
+    # Take a token for every (limiter, key) pair, or none if one of them is empty
+    def _take_tokens(self, keys):
+        now = time.monotonic()
+        with self._cond:
+            buckets = [self.limiters[name].bucket(key) for name, key in keys if key]
+            wait = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+            if wait > 0:
+                raise RateLimited("rate limited", retry_after=wait)
+            for bucket in buckets:
+                bucket.tokens -= 1
+        return buckets
+
+    def _give_back(self, buckets):
+        with self._cond:
+            for bucket in buckets:
+                bucket.tokens = min(bucket.burst, bucket.tokens + 1)
+
+    # Run the block once admitted:  with controller.admit(email=..., session=...): ...
+    # on_wait(position) is called whenever the 1-based queue position changes.
+    @contextmanager
+    def admit(self, email=None, session=None, on_wait=None):
+        buckets = self._take_tokens([("email", email and email.strip().lower()), ("session", session)])
+        try:
+            self._enter(on_wait)
+        except Overloaded:
+            self._give_back(buckets)  # Not the applicant's fault, don't count it
+            raise
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def _enter(self, on_wait):
+        ticket = next(self._tickets)
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            if not self._queue and self._running < self.max_concurrent:
+                self._running += 1
+                return
+            if len(self._queue) >= self.max_queue:
+                raise Overloaded("queue full", retry_after=self.queue_timeout)
+            self._queue.append(ticket)
+            position = None
+            try:
+                while True:
+                    index = self._queue.index(ticket)
+                    if index < self.max_concurrent - self._running:
+                        self._queue.remove(ticket)
+                        self._running += 1
+                        # Wake the next in line in case more than one slot is free
+                        self._cond.notify_all()
+                        return
+                    if on_wait is not None and index + 1 != position:
+                        position = index + 1
+                        self._cond.release()  # Don't hold up the queue while drawing
+                        try:
+                            on_wait(position)
+                        finally:
+                            self._cond.acquire()
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Overloaded("queue timeout", retry_after=self.queue_timeout)
+                    self._cond.wait(remaining)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    self._cond.notify_all()
+                raise
+
+    # (name, labels, value) gauges for the metrics exporters
+    def gauges(self):
+        with self._cond:
+            running, queued = self._running, len(self._queue)
+        yield "submit_running", {}, running
+        yield "submit_queued", {}, queued
+
+
+# Concurrency, queue and rate limits from the submit_* settings
+def default_admission():
+    return AdmissionController(
+        max_concurrent=get_setting("submit_concurrency", 4, int),
+        max_queue=get_setting("submit_queue_max", 50, int),
+        queue_timeout=get_setting("submit_queue_timeout", 30.0, float),
+        email_rate=get_setting("submit_per_email_per_hour", 6.0, float) / 3600,
+        email_burst=get_setting("submit_per_email_burst", 3, int),
+        session_rate=get_setting("submit_per_session_per_hour", 6.0, float) / 3600,
+        session_burst=get_setting("submit_per_session_burst", 3, int),
+    )
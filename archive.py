@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from attachments import COPY_BUFFER_SIZE, unique_names
+from config import DATA_DIR, as_bool, get_setting
+
+# Keep every submission's package (form values, uploads, DOCX) on disk under data/archive
+ARCHIVE_ENABLED = get_setting("submission_archive", False, as_bool)
+
+
+def _sendfile(in_fd, out_fd):
+    offset = 0
+    while True:
+        sent = os.sendfile(out_fd, in_fd, offset, 1 << 30)
+        if sent == 0:
+            return offset
+        offset += sent
+
+
+# Copy a file object to an open file without going through Python buffers where we can:
+# in-memory files (UploadedFile, InMemoryFile) are written straight from their buffer,
+# files backed by a descriptor (spilled uploads, open files) are copied by the kernel
+def _copy_into(fileobj, out):
+    getbuffer = getattr(fileobj, "getbuffer", None)
+    if getbuffer is not None:
+        with getbuffer() as view:
+            out.write(view)
+        return
+    try:
+        in_fd = fileobj.fileno()
+        out.flush()
+        _sendfile(in_fd, out.fileno())
+        return
+    except (AttributeError, OSError):
+        pass  # No descriptor, or sendfile not supported between these files
+    fileobj.seek(0)
+    shutil.copyfileobj(fileobj, out, COPY_BUFFER_SIZE)
+
+
+def _sha256(fileobj):
+    getbuffer = getattr(fileobj, "getbuffer", None)
+    if getbuffer is not None:
+        with getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    while chunk := fileobj.read(COPY_BUFFER_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Content-addressed store of submission packages. Files are kept once per SHA-256 under
+# blobs/ (a file sent again, e.g. by a second submission of the same person, costs
+# nothing) and each submission has a JSON manifest under manifests/ naming its files.
+# Blobs are never modified, so export() can hand them out as hardlinks.
+class SubmissionArchive:
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.manifest_dir = os.path.join(root, "manifests")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+
+    def blob_path(self, sha256):
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def manifest_path(self, submission_id):
+        return os.path.join(self.manifest_dir, f"{submission_id}.json")
+
+    # Store a file object (or a path) as a blob; returns its SHA-256
+    def put(self, fileobj):
+        if isinstance(fileobj, (str, os.PathLike)):
+            with open(fileobj, "rb") as f:
+                return self.put(f)
+        sha256 = _sha256(fileobj)
+        path = self.blob_path(sha256)
+        if os.path.exists(path):
+            return sha256  # Already stored
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            fileobj.seek(0)
+            with open(tmp_path, "wb") as out:
+                _copy_into(fileobj, out)
+            os.chmod(tmp_path, 0o444)
+            # link() never replaces an existing file: if another writer got there first
+            # its blob (with the same bytes) is kept
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+        finally:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return sha256
+
+    # Store a submission: `values` are the form values, `files` file objects with a name
+    # (and a type). Returns the manifest.
+    def store(self, submission_id, values, files, **extra):
+        entries = []
+        for file in files:
+            entries.append({
+                "name": os.path.basename(file if isinstance(file, str) else file.name),
+                "type": getattr(file, "type", None),
+                "sha256": self.put(file),
+            })
+        for entry in entries:
+            entry["size"] = os.path.getsize(self.blob_path(entry["sha256"]))
+        manifest = dict(extra, submission_id=submission_id, stored_at=time.time(), values=values, files=entries)
+        path = self.manifest_path(submission_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True, default=str)
+        os.replace(tmp_path, path)
+        return manifest
+
+    def load(self, submission_id):
+        try:
+            with open(self.manifest_path(submission_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def submissions(self):
+        return sorted(name[:-5] for name in os.listdir(self.manifest_dir) if name.endswith(".json"))
+
+    # Lay a submission out in `directory` under the original file names (hardlinks to
+    # the blobs, copies if the directory is on another filesystem); returns the paths
+    def export(self, submission_id, directory):
+        manifest = self.load(submission_id)
+        if manifest is None:
+            raise KeyError(submission_id)
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        entries = manifest["files"]
+        for entry, name in zip(entries, unique_names(os.path.basename(e["name"]) or e["sha256"] for e in entries)):
+            target = os.path.join(directory, name)
+            if os.path.exists(target):
+                os.remove(target)
+            try:
+                os.link(self.blob_path(entry["sha256"]), target)
+            except OSError:
+                shutil.copyfile(self.blob_path(entry["sha256"]), target)
+            paths.append(target)
+        with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        return paths
+
+
+# Archive in the app's data directory (or submission_archive_dir)
+def default_archive():
+    return SubmissionArchive(get_setting("submission_archive_dir", os.path.join(DATA_DIR, "archive")))
@@ -0,0 +1,24 @@
+import json
+import os
+from functools import lru_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Built by tools/build_assets.py; Streamlit serves this folder at app/static/
+# (server.enableStaticServing in .streamlit/config.toml)
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+MANIFEST_PATH = os.path.join(BASE_DIR, "resources", "asset_manifest.json")
+
+
+# Logical asset name -> {"file": content-hashed file name in static/, "hash": ...}
+@lru_cache(maxsize=1)
+def load_manifest():
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# URL of a built asset. The file name changes with the content, and the "v" query
+# argument makes the static handler send a far-future Cache-Control header, so
+# browsers fetch each version once.
+def asset_url(name):
+    entry = load_manifest()[name]
+    return f"app/static/{entry['file']}?v={entry['hash']}"
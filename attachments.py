@@ -0,0 +1,137 @@
+import hashlib
+import os
+
+# Chunk size for copying and hashing files without holding them in memory at once
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Upload slots of the form
+FRONT_ID = "front_id"
+BACK_ID = "back_id"
+ADDRESS_PROOF = "address_proof"
+
+
+# The names made unique within one folder: a second "scan.jpg" becomes "scan-2.jpg"
+def unique_names(names):
+    used = set()
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        while name in used:
+            counter += 1
+            name = f"{stem}-{counter}{ext}"
+        used.add(name)
+        yield name
+
+
+def hash_file(uploaded_file):
+    # UploadedFile is a BytesIO, hash its buffer without copying it
+    return hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+
+
+# One uploaded document held by a session
+class Attachment:
+    def __init__(self, file, sha256, job=None):
+        self.file = file
+        self.sha256 = sha256
+        self.job = job  # Background image processing (see image_pipeline), if any
+        self.name = file.name
+        self.type = getattr(file, "type", None)
+        self.size = file.getbuffer().nbytes
+        self.spilled = False
+
+    # Move the bytes to a temp file in `directory` (see session_memory)
+    def spill(self, directory):
+        from session_memory import SpilledFile
+        spilled = SpilledFile(self.file, directory)
+        self.file.close()
+        self.file = spilled
+        self.spilled = True
+
+    def release(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.file.close()  # Drops the BytesIO buffer (or the spilled temp file) held by this session
+
+
+# Per-session registry of uploaded documents, keyed by slot and by content hash.
+# Re-running a step is O(1), re-uploading identical bytes is a no-op and replacing a
+# slot's file releases the old one so stale files are neither kept nor emailed.
+class AttachmentRegistry:
+    def __init__(self):
+        self._slots = {}  # slot -> Attachment
+        self._by_hash = {}  # sha256 -> Attachment (shared by every slot holding those bytes)
+        self._file_ids = {}  # slot -> file_id of the upload last seen in that slot
+
+    # Store the file uploaded into a slot, replacing its previous file; returns the slot's Attachment.
+    # `sha256` saves hashing the file again when the caller has done so already.
+    def put(self, slot, uploaded_file, on_new=None, sha256=None):
+        current = self._slots.get(slot)
+        file_id = getattr(uploaded_file, "file_id", None)
+        if self.is_current(slot, uploaded_file):
+            return current  # Same widget value as last rerun
+
+        sha256 = sha256 or hash_file(uploaded_file)
+        self._file_ids[slot] = file_id
+        if current is not None and current.sha256 == sha256:
+            return current
+
+        attachment = self._by_hash.get(sha256)
+        if attachment is None:
+            attachment = Attachment(uploaded_file, sha256)
+            if on_new is not None:
+                attachment.job = on_new(uploaded_file)
+            self._by_hash[sha256] = attachment
+        self._release(slot)
+        self._slots[slot] = attachment
+        return attachment
+
+    # True if the slot already holds this widget value (no need to look at the bytes again)
+    def is_current(self, slot, uploaded_file):
+        file_id = getattr(uploaded_file, "file_id", None)
+        return slot in self._slots and file_id is not None and self._file_ids.get(slot) == file_id
+
+    def remove(self, slot):
+        self._file_ids.pop(slot, None)
+        self._release(slot)
+
+    def _release(self, slot):
+        attachment = self._slots.pop(slot, None)
+        if attachment is None:
+            return
+        # Only release the bytes once no other slot shares them
+        if not any(a is attachment for a in self._slots.values()):
+            del self._by_hash[attachment.sha256]
+            attachment.release()
+
+    def get(self, slot):
+        return self._slots.get(slot)
+
+    def __contains__(self, slot):
+        return slot in self._slots
+
+    def slots(self):
+        return list(self._slots)
+
+    # Unique attachments in upload order
+    def files(self):
+        return list(self._by_hash.values())
+
+    def __len__(self):
+        return len(self._by_hash)
+
+    @property
+    def total_bytes(self):
+        return sum(a.size for a in self._by_hash.values())
+
+    # Bytes held in memory and on disk respectively
+    @property
+    def memory_bytes(self):
+        return sum(a.size for a in self._by_hash.values() if not a.spilled)
+
+    @property
+    def spilled_bytes(self):
+        return sum(a.size for a in self._by_hash.values() if a.spilled)
+
+    def clear(self):
+        for slot in list(self._slots):
+            self.remove(slot)
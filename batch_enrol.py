@@ -0,0 +1,284 @@
+"""Headless batch enrolment from a partner-agency spreadsheet (CSV or XLSX).
+
+Every row is validated with the same rules as the Streamlit form (vectorized over the
+whole sheet), valid rows get their submission DOCX rendered in a process pool and their
+team/learner emails queued in the app's outbox (in digest mode the team emails are batched,
+see digest.py; with submission_archive on the packages are also kept in archive.py's store).
+Rows already queued by a recent run are skipped (app submissions never match: their
+fingerprints include the uploaded documents). Per-row errors and throughput are reported.
+
+With --deliver this process also runs outbox workers and waits for its emails. It may run
+while the app is up: both share the outbox, and each message is claimed by one worker only.
+
+Usage:  python batch_enrol.py applicants.xlsx [--validate-only] [--deliver] [--errors errors.csv]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from archive import ARCHIVE_ENABLED, default_archive
+from config import get_secret
+from docx_engine import DOCX_MIME_TYPE, render_submission
+from fingerprints import default_fingerprints, submission_fingerprint
+from ledger import default_ledger
+from mailer import InMemoryFile, send_spooled_file
+from digest import DIGEST_ENABLED, default_digest
+from notifications import digest_summary, submission_messages
+from outbox import PENDING, SENT, default_outbox
+from reference_data import GENDERS, LEARNING_MODES, SUB_OPTIONS, get_reference_data
+from dialing_codes import code_digits
+from validators import EMAIL_PATTERN
+
+# Spreadsheet columns (key, label); headers are matched case-insensitively on either
+COLUMNS = [
+    ("full_name", "Full Name"),
+    ("dob", "Date of Birth"),
+    ("gender", "Gender"),
+    ("country", "Country"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("address", "Address"),
+    ("previous_qualifications", "Previous Qualifications"),
+    ("current_institution", "Current Institution"),
+    ("subject_area", "Subject Area"),
+    ("course_level", "Course Level"),
+    ("learning_mode", "Learning Mode"),
+    ("learning_preferences", "Learning Preferences"),
+    ("special_requirements", "Special Requirements"),
+    ("emergency_contact", "Emergency Contact"),
+]
+
+# Other common header spellings
+ALIASES = {
+    "name": "full_name",
+    "date_of_birth": "dob",
+    "email_address": "email",
+    "phone_number": "phone",
+    "whatsapp": "phone",
+    "whatsapp_number": "phone",
+    "level": "course_level",
+    "mode": "learning_mode",
+}
+
+
+def _column_key(header):
+    return re.sub(r"[^a-z0-9]+", "_", str(header).strip().lower()).strip("_")
+
+
+def load_sheet(path, sheet=None):
+    if path.lower().endswith((".xlsx", ".xlsm", ".xls")):
+        frame = pd.read_excel(path, sheet_name=sheet or 0, dtype=str)
+    else:
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    frame = frame.fillna("")
+
+    keys = {_column_key(label): key for key, label in COLUMNS}
+    keys.update({key: key for key, _ in COLUMNS})
+    keys.update(ALIASES)
+    frame = frame.rename(columns=lambda header: keys.get(_column_key(header), header))
+    missing = [label for key, label in COLUMNS if key not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return frame[[key for key, _ in COLUMNS]].apply(lambda column: column.str.strip())
+
+
+# Phone checks of validate_phone_number, vectorized per dialing-code length. The length
+# rule is looked up once per distinct code and broadcast to its rows.
+def _phone_checks(phones, dialing_codes, trie):
+    phones = phones.str.replace(r"[ -]", "", regex=True)
+    prefixes = "+" + dialing_codes.map(code_digits)
+    rules = {code: trie.length_rule(code) for code in dialing_codes.unique() if code}
+    min_digits = dialing_codes.map(lambda code: rules.get(code, (0, 0))[0])
+    max_digits = dialing_codes.map(lambda code: rules.get(code, (0, 0))[1])
+    prefix_lengths = prefixes.str.len()
+    has_code = pd.Series(False, index=phones.index)
+    number = pd.Series("", index=phones.index)
+    for length in prefix_lengths.unique():
+        rows = prefix_lengths == length
+        has_code[rows] = (phones[rows].str[:length] == prefixes[rows]).to_numpy(dtype=bool)
+        number[rows] = phones[rows].str[length:]
+    number_length = number.str.len()
+    valid_number = number.str.fullmatch(r"\d+") & (number_length >= min_digits) & (number_length <= max_digits)
+    return has_code & (dialing_codes != ""), valid_number
+
+
+# Fill a blank Country from the phone number's dialing code when it identifies exactly
+# one country; returns the number of rows filled
+def fill_countries(frame, reference_data=None):
+    reference_data = reference_data or get_reference_data()
+    blank = (frame["country"] == "") & (frame["phone"] != "")
+    detected = frame.loc[blank, "phone"].map(reference_data.countries_for_phone)
+    detected = detected[detected.map(len) == 1].map(lambda countries: next(iter(countries)))
+    frame.loc[detected.index, "country"] = detected
+    return len(detected)
+
+
+# Validate every row at once; returns (parsed dates of birth, list of error messages per row)
+def validate_frame(frame, reference_data=None):
+    reference_data = reference_data or get_reference_data()
+    filled = frame != ""
+    dob = pd.to_datetime(frame["dob"], dayfirst=True, errors="coerce")
+    dialing_codes = frame["country"].map(reference_data.countries).fillna("")
+    has_code, valid_number = _phone_checks(frame["phone"], dialing_codes, reference_data.dialing_codes)
+
+    checks = [(~filled[key], f"{label} is required.") for key, label in COLUMNS]
+    checks += [
+        (filled["email"] & ~frame["email"].str.match(EMAIL_PATTERN), "Please enter a valid email address."),
+        (filled["dob"] & (dob.isna() | (dob > pd.Timestamp.today())), "Date of birth is not a valid past date."),
+        (filled["gender"] & ~frame["gender"].isin(GENDERS), f"Gender must be one of {', '.join(GENDERS)}."),
+        (filled["country"] & (dialing_codes == ""), "Country is not recognised."),
+        (filled["phone"] & (dialing_codes != "") & ~has_code, "Phone number must start with the country's dialing code."),
+        (filled["phone"] & has_code & ~valid_number, "Phone number has the wrong number of digits for the country."),
+        (filled["subject_area"] & ~frame["subject_area"].isin(reference_data.subject_areas), "Subject area is not offered."),
+        (filled["course_level"] & ~frame["course_level"].isin(SUB_OPTIONS), f"Course level must be one of {', '.join(SUB_OPTIONS)}."),
+        (filled["learning_mode"] & ~frame["learning_mode"].isin(LEARNING_MODES), f"Learning mode must be one of {', '.join(LEARNING_MODES)}."),
+    ]
+
+    # rows x checks matrix, then collect the messages of the failing checks per row
+    failed = np.column_stack([mask.to_numpy(dtype=bool) for mask, _ in checks])
+    messages = [message for _, message in checks]
+    errors = [[] for _ in range(len(frame))]
+    for row, check in zip(*np.nonzero(failed)):
+        errors[row].append(messages[check])
+    return dob, errors
+
+
+# Form values in the shape used by the DOCX template, ledger and notifications
+def submission_values(frame, dob):
+    values = frame.assign(
+        dob=dob.dt.strftime('%d-%m-%Y'),
+        course=frame["subject_area"] + " - " + frame["course_level"] + " (" + frame["learning_mode"] + ")",
+    )
+    return values.drop(columns=["subject_area", "course_level", "learning_mode"]).to_dict("records")
+
+
+def _render(values):
+    return render_submission(values)
+
+
+def wait_for_delivery(outbox, submission_ids, timeout):
+    deadline = time.monotonic() + timeout
+    remaining = set(submission_ids)
+    while remaining and time.monotonic() < deadline:
+        remaining = {s for s in remaining if outbox.status(s)["status"] == PENDING}
+        time.sleep(0.5)
+    return remaining
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or XLSX file with one applicant per row")
+    parser.add_argument("--sheet", help="Worksheet name for XLSX files (default: first sheet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes rendering DOCX files")
+    parser.add_argument("--validate-only", action="store_true", help="Only report validation errors")
+    parser.add_argument("--deliver", action="store_true", help="Deliver the queued emails from this process and wait")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for delivery with --deliver")
+    parser.add_argument("--errors", help="Write rejected rows and their errors to this CSV file")
+    args = parser.parse_args(argv)
+
+    # Needed to queue anything; checked before the sheet is validated and rendered
+    sender_email = None
+    if not args.validate_only:
+        try:
+            sender_email = get_secret("sender_email")
+        except FileNotFoundError:  # No env var and no secrets.toml for st.secrets to read
+            pass
+        if not sender_email:
+            print("No sender_email configured (set it in the environment, .env or .streamlit/secrets.toml)", file=sys.stderr)
+            return 2
+
+    started = time.perf_counter()
+    try:
+        frame = load_sheet(args.path, args.sheet)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read {args.path}: {e}", file=sys.stderr)
+        return 2
+
+    filled = fill_countries(frame)
+    if filled:
+        print(f"Filled in the country of {filled} rows from their phone numbers")
+    dob, errors = validate_frame(frame)
+    valid = np.array([not e for e in errors], dtype=bool)
+    validated = time.perf_counter()
+
+    for position, row_errors in enumerate(errors):
+        if row_errors:
+            # +2: spreadsheet rows are 1-based and the first row holds the headers
+            print(f"Row {position + 2}: {' '.join(row_errors)}")
+    if args.errors:
+        rejected = frame[~valid].assign(errors=[" ".join(e) for e in errors if e])
+        rejected.index = np.flatnonzero(~valid) + 2
+        rejected.to_csv(args.errors, index_label="row")
+    print(f"{valid.sum()} of {len(frame)} rows valid ({validated - started:.2f}s to load and validate)")
+
+    if args.validate_only or not valid.any():
+        return 0 if valid.all() else 1
+
+    # Skip rows queued recently (the same sheet run twice, a row repeated in the sheet).
+    # Rows have no attachments, so only earlier batch rows can have the same fingerprint.
+    fingerprints = default_fingerprints()
+    rows, row_fingerprints = [], []
+    for values in submission_values(frame[valid], dob[valid]):
+        fingerprint = submission_fingerprint(values)
+        if fingerprints.lookup(fingerprint) is None:
+            rows.append(values)
+            row_fingerprints.append(fingerprint)
+    if len(rows) < valid.sum():
+        print(f"Skipped {valid.sum() - len(rows)} rows submitted before")
+    if not rows:
+        return 0 if valid.all() else 1
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        documents = list(pool.map(_render, rows, chunksize=max(1, len(rows) // (4 * (args.workers or 1)))))
+    rendered = time.perf_counter()
+
+    outbox = default_outbox(send=send_spooled_file)
+    digest = default_digest(outbox) if DIGEST_ENABLED else None
+    archive = default_archive() if ARCHIVE_ENABLED else None
+    ledger = default_ledger()
+    submission_ids = []
+    ledger_rows = []
+    for values, document, fingerprint in zip(rows, documents, row_fingerprints):
+        # Claimed only now, so rows this run fails to queue are not skipped next time
+        submission_id = uuid.uuid4().hex
+        if fingerprints.reserve(fingerprint, submission_id) != submission_id:
+            continue  # Same row twice in the sheet, or sent by someone else meanwhile
+        doc_file = InMemoryFile(document, f"ICAN_Form_Submission_{values['full_name']}.docx", DOCX_MIME_TYPE)
+        outbox.enqueue(submission_messages(sender_email, values, [doc_file], team=digest is None), submission_id=submission_id)
+        if digest is not None:
+            digest.add(submission_id, digest_summary(values), [doc_file])
+        if archive is not None:
+            archive.store(submission_id, values, [doc_file])
+        submission_ids.append(submission_id)
+        ledger_rows.append(dict(values, submission_id=submission_id, submitted_at=datetime.now().isoformat(timespec="seconds"), attachments=doc_file.name))
+    ledger.flush(ledger_rows)
+    queued = time.perf_counter()
+
+    print(f"Rendered {len(rows)} DOCX files in {rendered - validated:.2f}s ({len(rows) / (rendered - validated):.1f}/s)")
+    print(f"Queued {len(submission_ids)} submissions in {queued - rendered:.2f}s ({len(submission_ids) / (queued - rendered):.1f}/s)")
+    print(f"Total {queued - started:.2f}s, {len(frame) / (queued - started):.1f} rows/s")
+
+    if args.deliver:
+        # Send the team digests now rather than when the app's digest window ends
+        while digest is not None and (batch_id := digest.flush(force=True)):
+            submission_ids.append(batch_id)
+        outbox.start()
+        wait_for_delivery(outbox, submission_ids, args.timeout)
+        outbox.stop()
+        delivered = sum(outbox.status(s)["status"] == SENT for s in submission_ids)
+        print(f"Delivered {delivered} of {len(submission_ids)} submissions")
+        if delivered < len(submission_ids):
+            return 1
+    return 0 if valid.all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
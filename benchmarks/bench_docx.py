@@ -0,0 +1,97 @@
+"""Compare submission DOCX generation throughput.
+
+legacy   - the original Submit handler: Document() built paragraph by paragraph,
+           saved to the working directory and read back for the email.
+template - docx_engine: the branded template parsed once, filled into memory.
+
+Run from the repository root:  python benchmarks/bench_docx.py [-n 200]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx_engine import FIELDS, get_template  # noqa: E402
+
+VALUES = {
+    "full_name": "Jane Doe",
+    "dob": "02-01-1990",
+    "gender": "Female",
+    "country": "United Kingdom",
+    "email": "jane@example.com",
+    "phone": "+447911123456",
+    "address": "1 High Street\nUxbridge",
+    "previous_qualifications": "A levels",
+    "current_institution": "none",
+    "course": "Anthropology - Undergraduate (Online)",
+    "learning_preferences": "Visual",
+    "special_requirements": "None",
+    "emergency_contact": "John Doe +447911000000",
+}
+
+
+def make_signature():
+    image_data = np.zeros((150, 600, 4), dtype=np.uint8)
+    image_data[60:90, 100:500] = (0, 0, 0, 255)
+    return image_data
+
+
+def encode_signature(image_data):
+    image = Image.fromarray(image_data.astype(np.uint8))
+    image_stream = io.BytesIO()
+    image.save(image_stream, format='PNG')
+    return image_stream, image.width, image.height
+
+
+def legacy(workdir, signature):
+    doc = Document()
+    doc.add_heading('Enrolment Form Submission', 0)
+    for key, label in FIELDS:
+        doc.add_paragraph(f'{label}: {VALUES[key]}')
+    image_stream, _, _ = encode_signature(signature)
+    image_stream.seek(0)
+    doc.add_picture(image_stream, width=Inches(2))
+    doc_path = os.path.join(workdir, f"ICAN_Form_Submission_{VALUES['full_name']}.docx")
+    doc.save(doc_path)
+    with open(doc_path, 'rb') as f:
+        return f.read()
+
+
+def template(signature):
+    image_stream, width, height = encode_signature(signature)
+    return get_template().render(VALUES, (image_stream.getvalue(), width, height))
+
+
+def run(name, func, iterations):
+    func()  # Warm up (imports, template parsing)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        size = len(func())
+    elapsed = time.perf_counter() - start
+    print(f"{name:<9} {iterations / elapsed:8.1f} docs/s  {elapsed / iterations * 1000:7.2f} ms/doc  {size / 1024:6.1f} KiB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    signature = make_signature()
+    with tempfile.TemporaryDirectory() as workdir:
+        legacy_time = run("legacy", lambda: legacy(workdir, signature), args.iterations)
+    template_time = run("template", lambda: template(signature), args.iterations)
+    print(f"speedup   {legacy_time / template_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
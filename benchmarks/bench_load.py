@@ -0,0 +1,348 @@
+"""Drive many simulated applicants through the whole enrolment form at once.
+
+Every applicant is a headless Streamlit session (AppTest) running app.py in this
+process, the way sessions share one server process in production. Each fills in all
+14 steps, uploads an ID photo and a proof of address and draws a synthetic
+signature; Submit delivers through the outbox to a local SMTP sink started by this
+script, never to the configured mail server. The app writes into a temporary data
+directory.
+
+Reported: applicants and reruns per second, p50/p95/p99 of each step (the rerun
+triggered by its Next button, the review step's being Submit), time until every email
+reached the sink, and peak RSS of this process and of its child processes (image
+workers).
+
+AppTest cannot drive file uploaders or the signature canvas; uploads are put into the
+session's attachment registry (what the uploader callback does) and the signature is
+assigned to its session field.
+
+Run from the repository root:  python benchmarks/bench_load.py [--users 50] [--concurrency 10]
+"""
+import argparse
+import io
+import logging
+import os
+import random
+import resource
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import MagicMock
+from urllib import parse
+
+from streamlit import source_util
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+from streamlit.testing.v1.util import patch_config_options
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# Minimal SMTP server accepting every message (no TLS, no AUTH), one thread per connection
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), _SMTPHandler)
+        self.received = []  # (sender, recipients, bytes)
+        self.delivered = threading.Condition()
+        threading.Thread(target=self.serve_forever, name="smtp-sink", daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def record(self, sender, recipients, size):
+        with self.delivered:
+            self.received.append((sender, recipients, size))
+            self.delivered.notify_all()
+
+    # Block until `count` messages arrived; returns False on timeout
+    def wait_for(self, count, timeout):
+        with self.delivered:
+            return self.delivered.wait_for(lambda: len(self.received) >= count, timeout)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 localhost SMTP sink")
+        sender, recipients = None, []
+        for raw in self.rfile:
+            command = raw.decode("ascii", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif verb in ("HELO", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                    size += len(line)
+                self.server.record(sender, recipients, size)
+                self.reply("250 OK")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+def synthetic_photo(seed, size_kb):
+    # Noise compresses badly, so the JPEG ends up roughly size_kb large
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    side = max(64, int((size_kb * 1024 / 1.5) ** 0.5))
+    pixels = rng.integers(0, 256, (side, side, 3), dtype=np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def synthetic_signature(seed):
+    import numpy as np
+    from signature import Signature
+    rng = random.Random(seed)
+    canvas = np.zeros((150, 600, 4), dtype=np.uint8)
+    x, y = 40, 75
+    for _ in range(120):
+        x = min(max(x + rng.randint(0, 6), 0), 595)
+        y = min(max(y + rng.randint(-4, 4), 5), 145)
+        canvas[y - 2:y + 2, x - 2:x + 2] = (0, 0, 0, 255)
+    return Signature.from_canvas(canvas)
+
+
+# AppTest installs a mock Runtime and patches Streamlit's config around every run and
+# removes them afterwards, which breaks the runs of other sessions going on in other
+# threads. Here they are installed once for the process (install_test_runtime) and
+# each run only executes the script. As in the server, the compiled script is shared
+# by all sessions (compiling it in many threads at once trips a CPython 3.11 bug,
+# "AST constructor recursion depth mismatch"). Every AppTest also calls itself "test
+# session id"; each applicant gets its own id so per-session accounting works.
+class SessionAppTest(AppTest):
+    def __init__(self, script_path, default_timeout):
+        super().__init__(script_path, default_timeout=default_timeout)
+        self.session_id = uuid.uuid4().hex
+
+    def _run(self, widget_state=None, timeout=None):
+        pages_manager = PagesManager(self._script_path, setup_watcher=False)
+        runner = LocalScriptRunner(self._script_path, self.session_state, pages_manager, args=self.args, kwargs=self.kwargs)
+        runner._session_id = self.session_id
+        runner._script_cache = _script_cache
+        self._tree = runner.run(widget_state, self.query_params, self.default_timeout if timeout is None else timeout, self._page_hash)
+        self._tree._runner = self
+        self.query_params = parse.parse_qs(runner.event_data[-1]["client_state"].query_string)
+        return self
+
+
+_script_cache = ScriptCache()
+_config_patch = None
+
+
+def install_test_runtime():
+    global _config_patch
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    source_util._cached_pages = None
+    _config_patch = patch_config_options({"global.appTest": True})  # Kept for the rest of the process
+    _config_patch.__enter__()
+
+
+class Applicant:
+    def __init__(self, index, upload_kb, timeout):
+        self.index = index
+        self.upload_kb = upload_kb
+        self.timeout = timeout
+        self.timings = []  # (step name, seconds of the rerun its Next button caused)
+        self.reruns = 0
+        self.step = 1
+
+    def run(self):
+        self.at = SessionAppTest(os.path.join(ROOT, "app.py"), default_timeout=self.timeout)
+        try:
+            self._run()
+            self.fill_in()
+        except Exception as e:
+            raise RuntimeError(f"applicant {self.index} on step {self.step}: {type(e).__name__}: {e}") from e
+        return self
+
+    def _run(self, widget=None):
+        (widget or self.at).run()
+        self.reruns += 1
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def next(self):
+        from steps import STEPS
+        start = time.perf_counter()
+        self._run(self.at.button(key=f"next_{self.step}").click())
+        self.timings.append((STEPS[self.step - 1].name, time.perf_counter() - start))
+        if self.at.session_state["step"] != self.step + 1:
+            raise RuntimeError(f"still on the step: {[w.value for w in self.at.warning]}")
+        self.step += 1
+
+    def fill_in(self):
+        from attachments import ADDRESS_PROOF, FRONT_ID
+        from mailer import InMemoryFile
+        from reference_data import LEARNING_MODES, SUB_OPTIONS, get_reference_data
+        import image_pipeline
+        at = self.at
+        rng = random.Random(self.index)
+        reference_data = get_reference_data()
+
+        self.next()  # Welcome
+        self._run(at.text_input(key="personal_info").input(f"Applicant {self.index}"))
+        self.next()
+        self._run(at.date_input(key="dob").set_value(date(1980 + rng.randrange(25), rng.randint(1, 12), rng.randint(1, 28))))
+        self.next()
+        self._run(at.selectbox(key="gender").select_index(1))
+        self.next()
+        self._run(at.selectbox(key="country").set_value("United Kingdom"))
+        self.next()
+        self._run(at.text_input(key="email").input(f"applicant{self.index}@example.com"))
+        self._run(at.text_input(key="phone").input(f"+4479{rng.randrange(10 ** 8):08d}"))
+        self._run(at.text_area(key="address").input(f"{self.index} High Street\nUxbridge"))
+        self.next()
+        self._run(at.text_area(key="previous_qualifications").input("A levels"))
+        self._run(at.text_input(key="current_institution").input("None"))
+        self.next()
+        self._run(at.selectbox(key="subject_area").set_value(rng.choice(reference_data.subject_areas)))
+        self._run(at.selectbox(key="sub_option").set_value(rng.choice(SUB_OPTIONS)))
+        self._run(at.selectbox(key="learning_mode").set_value(rng.choice(LEARNING_MODES)))
+        self.next()
+
+        attachments = at.session_state.attachments
+        photo = InMemoryFile(synthetic_photo(self.index, self.upload_kb), "passport.jpg", "image/jpeg")
+        attachments.put(FRONT_ID, photo, on_new=image_pipeline.submit)
+        self.next()
+        bill = InMemoryFile(b"%PDF-1.4\n" + os.urandom(self.upload_kb * 1024), "bill.pdf", "application/pdf")
+        attachments.put(ADDRESS_PROOF, bill, on_new=image_pipeline.submit)
+        self.next()
+
+        self._run(at.text_area(key="learning_preferences").input("Visual"))
+        self._run(at.text_area(key="special_requirements").input("None"))
+        self._run(at.text_input(key="emergency_contact").input("Next of kin +447911000000"))
+        self._run(at.checkbox(key="consent").check())
+        self.next()
+        at.session_state.signature = synthetic_signature(self.index)
+        self.next()
+        self.next()  # Submit
+
+
+# Stop the outbox and ledger threads before their files go away. st.cache_resource only
+# hands out the instances the sessions use inside a script run, hence a script.
+def stop_background_writers(data_dir):
+    path = os.path.join(data_dir, "stop_writers.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("import steps\nsteps.get_outbox().stop()\nsteps.get_ledger().stop()\n")
+    SessionAppTest(path, default_timeout=60).run()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def peak_rss_mib(who):
+    return resource.getrusage(who).ru_maxrss / 1024  # KiB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="Applicants to run through the form")
+    parser.add_argument("--concurrency", type=int, default=5, help="Applicants filling in the form at the same time")
+    parser.add_argument("--upload-kb", type=int, default=300, help="Approximate size of each uploaded document")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds a single rerun may take")
+    parser.add_argument("--delivery-timeout", type=float, default=300, help="Seconds to wait for the emails")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the data directory (outbox, ledger, drafts)")
+    args = parser.parse_args()
+    # Reading a session's state from the applicant threads (between runs) logs a warning
+    # each time; a filter, as Streamlit resets its loggers' levels when it loads its config
+    logging.getLogger("streamlit.runtime.scriptrunner.script_run_context").addFilter(lambda record: False)
+
+    sink = SMTPSink()
+    data_dir = tempfile.mkdtemp(prefix="enrol-load-")
+    # Before any app module reads its settings
+    os.environ.update(
+        data_dir=data_dir, smtp_host="127.0.0.1", smtp_port=str(sink.port), smtp_starttls="0",
+        sender_email="loadtest@example.com", sender_password="",
+    )
+    os.chdir(ROOT)
+    install_test_runtime()
+
+    import steps  # noqa: F401  Warm the module cache so the first applicants don't pay for the imports
+
+    start = time.perf_counter()
+    failures = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(Applicant(i, args.upload_kb, args.timeout).run) for i in range(args.users)]
+        applicants = []
+        for future in futures:
+            try:
+                applicants.append(future.result())
+            except Exception as e:
+                failures.append(e)
+    elapsed = time.perf_counter() - start
+
+    delivered = sink.wait_for(2 * len(applicants), args.delivery_timeout)
+    delivery = time.perf_counter() - start
+
+    reruns = sum(a.reruns for a in applicants)
+    print(f"applicants {len(applicants)} completed, {len(failures)} failed in {elapsed:.1f} s"
+          f" ({len(applicants) / elapsed:.2f}/s, {reruns / elapsed:.1f} reruns/s, concurrency {args.concurrency})")
+    for e in failures[:5]:
+        print(f"           failed: {e}")
+
+    by_step = {}
+    for applicant in applicants:
+        for name, seconds in applicant.timings:
+            by_step.setdefault("submit" if name == "review" else name, []).append(seconds)
+    print(f"{'step':<18}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, values in by_step.items():
+        print(f"{name:<18}{len(values):>6}" + "".join(f"{percentile(values, q) * 1000:>10.1f}" for q in (50, 95, 99)))
+
+    status = "delivered" if delivered else "delivered, NOT all before the timeout"
+    print(f"emails     {len(sink.received)} {status}, {delivery:.1f} s after the start")
+    print(f"peak RSS   {peak_rss_mib(resource.RUSAGE_SELF):.1f} MiB, child processes {peak_rss_mib(resource.RUSAGE_CHILDREN):.1f} MiB")
+    stop_background_writers(data_dir)
+    if args.keep_data:
+        print(f"data dir   {data_dir}")
+    else:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    # Non-zero when an applicant failed or emails are missing, so CI can tell
+    return 0 if delivered and not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Measure the app's cold start and per-rerun cost.
+
+import  - fresh interpreters importing the app's modules (python -X importtime), median
+          wall time over the runs and the slowest modules they pull in
+first   - fresh process rendering the first page of app.py (Streamlit AppTest), i.e. the
+          first-request latency of a newly started container
+rerun   - further full reruns of the welcome page in that process
+
+Run from the repository root:  python benchmarks/bench_startup.py [-n 5] [--top 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Child process for "first" and "rerun": prints the timings as JSON
+CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120).run()
+first = time.perf_counter()
+reruns = []
+for _ in range(int(sys.argv[1])):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+print(json.dumps({"first": first - started, "reruns": reruns,
+                  "modules": len(sys.modules), "exception": bool(at.exception)}))
+"""
+
+
+def run_python(args):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        sys.exit(completed.stderr)
+    return elapsed, completed
+
+
+# Parse "-X importtime" output: cumulative µs of `module` and of each module it imports directly
+def parse_importtime(stderr, module):
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        # A module is reported after everything it imported
+        if depth == 0:
+            if name.strip() == module:
+                return int(cumulative_us), children
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative_us), name.strip()))
+    raise ValueError(f"{module} not found in the importtime output")
+
+
+def bench_import(iterations, top):
+    times = []
+    for _ in range(iterations):
+        elapsed, completed = run_python(["-X", "importtime", "-c", "import steps"])
+        times.append(elapsed)
+    total, children = parse_importtime(completed.stderr, "steps")
+    print(f"import    {statistics.median(times) * 1000:8.1f} ms process (median of {iterations}),"
+          f" {total / 1000:.1f} ms importing steps")
+    for cumulative, name in sorted(children, reverse=True)[:top]:
+        print(f"          {cumulative / 1000:8.1f} ms  {name}")
+
+
+def bench_app(iterations, reruns):
+    firsts = []
+    rerun_times = []
+    for _ in range(iterations):
+        _, completed = run_python(["-c", CHILD, str(reruns)])
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if result["exception"]:
+            sys.exit("app.py raised an exception")
+        firsts.append(result["first"])
+        rerun_times.extend(result["reruns"])
+    print(f"first     {statistics.median(firsts) * 1000:8.1f} ms first page (median of {iterations}), {result['modules']} modules loaded")
+    print(f"rerun     {statistics.median(rerun_times) * 1000:8.1f} ms per rerun (median of {len(rerun_times)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns per process")
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports to list")
+    args = parser.parse_args()
+
+    bench_import(args.iterations, args.top)
+    bench_app(args.iterations, args.reruns)
+
+
+if __name__ == "__main__":
+    main()
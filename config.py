@@ -0,0 +1,75 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+import streamlit as st
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+load_dotenv()
+
+
+# add render support along with st.secret
+def get_secret(key):
+    try:
+        load_dotenv()
+        # Attempt to get the secret from environment variables
+        secret = os.environ.get(key)
+        if secret is None:
+            raise ValueError("Secret not found in environment variables")
+        return secret
+    except (ValueError, TypeError) as e:
+        # If an error occurs, fall back to Streamlit secrets
+        if hasattr(st, 'secrets'):
+            return st.secrets.get(key)
+        # If still not found, return None or handle as needed
+        return None
+
+
+# Convert "1"/"true"/"yes"/"on" style settings into booleans
+def as_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Read an optional setting (env var or st.secrets) falling back to a default
+def get_setting(key, default=None, cast=str):
+    value = os.environ.get(key)
+    # Only consult st.secrets when a secrets.toml exists (otherwise Streamlit renders an error)
+    if value is None and st.secrets.load_if_toml_exists():
+        value = st.secrets.get(key)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# Directory for everything the app writes at runtime (outbox, spool, ...)
+DATA_DIR = get_setting("data_dir", os.path.join(BASE_DIR, "data"))
+
+
+# One SQLite connection per use: committed when the block succeeds, rolled back if it
+# raises, closed either way. The app's stores are shared with batch jobs, hence the
+# generous busy timeout.
+@contextmanager
+def connect_db(db_path, foreign_keys=False):
+    conn = sqlite3.connect(db_path, timeout=30)
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys=ON")
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# Create a store's database (and its directory) from its schema, in WAL mode so that
+# readers never wait for the writer
+def init_db(db_path, schema):
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    with connect_db(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
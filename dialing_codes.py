@@ -0,0 +1,69 @@
+import re
+
+# E.164 allows at most 15 digits in total, country code included
+E164_MAX_DIGITS = 15
+# Shortest national number we accept for codes without a specific length rule
+DEFAULT_MIN_DIGITS = 4
+
+
+# Dialing codes are written like "+44" or "+1-242"; compare them as plain digits
+def code_digits(dialing_code):
+    return re.sub(r"\D", "", dialing_code)
+
+
+class _Node:
+    __slots__ = ("children", "code", "countries")
+
+    def __init__(self):
+        self.children = {}
+        self.code = None  # Dialing code (as written in the data file) ending at this node
+        self.countries = frozenset()
+
+
+# Longest-prefix trie over every dialing code. Codes are matched digit by digit, so a
+# lookup costs O(length of the number) no matter how many countries there are, and the
+# most specific code wins ("+1242" for the Bahamas rather than "+1"). Countries sharing
+# a code (e.g. +1, +7) are all returned.
+class DialingCodeTrie:
+    def __init__(self, countries, lengths=None):
+        self._root = _Node()
+        self._lengths = {}
+        by_code = {}
+        for country, code in countries.items():
+            by_code.setdefault(code_digits(code), []).append((country, code))
+        for digits, entries in by_code.items():
+            if not digits:
+                continue
+            node = self._root
+            for digit in digits:
+                node = node.children.setdefault(digit, _Node())
+            node.code = entries[0][1]
+            node.countries = frozenset(country for country, _ in entries)
+        # Length rules are keyed by "+digits"; fall back to the E.164 bounds
+        for code, (low, high) in (lengths or {}).items():
+            self._lengths[code_digits(code)] = (low, high)
+
+    # Return (dialing code, countries) for the longest code the number starts with,
+    # or (None, empty set). The number may include "+", spaces and dashes.
+    def match(self, phone):
+        node = self._root
+        best = None
+        for char in phone:
+            if char in " -+()":
+                continue
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.code is not None:
+                best = node
+        if best is None:
+            return None, frozenset()
+        return best.code, best.countries
+
+    # Allowed (min, max) digits after the dialing code
+    def length_rule(self, dialing_code):
+        digits = code_digits(dialing_code)
+        rule = self._lengths.get(digits)
+        if rule is None:
+            rule = (DEFAULT_MIN_DIGITS, E164_MAX_DIGITS - len(digits))
+        return rule
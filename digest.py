@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+from attachments import COPY_BUFFER_SIZE, unique_names
+from config import DATA_DIR, as_bool, connect_db, get_secret, get_setting, init_db
+
+logger = logging.getLogger(__name__)
+
+# Optional digest mode: team notifications are collected and sent as one email per batch
+DIGEST_ENABLED = get_setting("team_digest", False, as_bool)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digest_items (
+    submission_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    package_dir TEXT NOT NULL,
+    batch_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS digest_items_batch ON digest_items (batch_id, created_at);
+"""
+
+
+# Safe file/folder name for the archive (names come from applicants)
+def _safe_name(name):
+    name = re.sub(r"[^\w.\- ]+", "_", os.path.basename(str(name))).strip(" .")
+    return name or "file"
+
+
+# Team notifications in batches. add() stores a submission's package (form values and
+# files) on disk; a background thread sends one email per batch, with a summary table
+# and a ZIP of the packages, once the oldest waiting submission is `window` seconds old
+# or `max_items` are waiting. Batches go through the outbox like any other message.
+class TeamDigest:
+    def __init__(self, db_path, package_dir, outbox, build_message, window=15 * 60, max_items=25):
+        self.db_path = db_path
+        self.package_dir = package_dir
+        self.outbox = outbox
+        self.build_message = build_message  # (sender_email, summaries, archive_path) -> OutgoingEmail
+        self.window = window
+        self.max_items = max_items
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        os.makedirs(self.package_dir, exist_ok=True)
+        init_db(self.db_path, SCHEMA)
+        self._recover()
+
+    # Keep a submission for the next batch. `summary` holds the values shown in the
+    # table, `files` are file objects with a name (uploads, the rendered DOCX).
+    def add(self, submission_id, summary, files):
+        package = os.path.join(self.package_dir, submission_id)
+        os.makedirs(package, exist_ok=True)
+        files = list(files)
+        for file, name in zip(files, unique_names(_safe_name(file.name) for file in files)):
+            file.seek(0)
+            with open(os.path.join(package, name), "wb") as out:
+                shutil.copyfileobj(file, out, COPY_BUFFER_SIZE)
+
+        with connect_db(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO digest_items (submission_id, summary, package_dir, batch_id, created_at) VALUES (?, ?, ?, NULL, ?)",
+                (submission_id, json.dumps(summary), package, time.time()),
+            )
+            waiting = conn.execute("SELECT COUNT(*) FROM digest_items WHERE batch_id IS NULL").fetchone()[0]
+        if waiting >= self.max_items:
+            self._wakeup.set()
+
+    # Seconds until the waiting submissions are due, 0 if due now, None if none wait
+    def _due_in(self):
+        with connect_db(self.db_path) as conn:
+            count, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM digest_items WHERE batch_id IS NULL"
+            ).fetchone()
+        if not count:
+            return None
+        if count >= self.max_items:
+            return 0
+        return max(0.0, oldest + self.window - time.time())
+
+    # Send the waiting submissions as one batch if they are due (or `force`); returns the batch id
+    def flush(self, force=False):
+        due_in = self._due_in()
+        if due_in is None or (due_in > 0 and not force):
+            return None
+        batch_id = f"digest-{uuid.uuid4().hex}"
+        with connect_db(self.db_path) as conn:
+            # Claimed with one UPDATE, so concurrent flushes (e.g. a batch job) never share items
+            conn.execute(
+                "UPDATE digest_items SET batch_id = ? WHERE submission_id IN "
+                "(SELECT submission_id FROM digest_items WHERE batch_id IS NULL ORDER BY created_at LIMIT ?)",
+                (batch_id, self.max_items),
+            )
+            items = conn.execute(
+                "SELECT submission_id, summary, package_dir FROM digest_items WHERE batch_id = ? ORDER BY created_at",
+                (batch_id,),
+            ).fetchall()
+        if not items:
+            return None
+        try:
+            self._send(batch_id, items)
+        except Exception:
+            with connect_db(self.db_path) as conn:
+                conn.execute("UPDATE digest_items SET batch_id = NULL WHERE batch_id = ?", (batch_id,))
+            raise
+        self._forget(batch_id, items)
+        return batch_id
+
+    def _send(self, batch_id, items):
+        # The file name is what the team sees as the attachment name
+        archive_dir = os.path.join(self.package_dir, batch_id)
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.join(archive_dir, f"ICAN_Submissions_{time.strftime('%Y-%m-%d_%H%M')}.zip")
+        summaries = []
+        try:
+            with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for submission_id, summary, package in items:
+                    summary = json.loads(summary)
+                    summaries.append(dict(summary, submission_id=submission_id))
+                    folder = _safe_name(f"{summary.get('full_name', '')} {submission_id[:8]}")
+                    for name in sorted(os.listdir(package)):
+                        archive.write(os.path.join(package, name), f"{folder}/{name}")
+            message = self.build_message(get_secret("sender_email"), summaries, archive_path)
+            self.outbox.enqueue([("digest", message)], submission_id=batch_id)  # Spools its own copy
+        finally:
+            shutil.rmtree(archive_dir, ignore_errors=True)
+        logger.info("Queued team digest %s with %d submissions", batch_id, len(items))
+
+    def _forget(self, batch_id, items):
+        with connect_db(self.db_path) as conn:
+            conn.execute("DELETE FROM digest_items WHERE batch_id = ?", (batch_id,))
+        for _, _, package in items:
+            shutil.rmtree(package, ignore_errors=True)
+
+    # Batches claimed when the process died: done if the outbox has the message, else waiting again
+    def _recover(self):
+        with connect_db(self.db_path) as conn:
+            batches = [row[0] for row in conn.execute("SELECT DISTINCT batch_id FROM digest_items WHERE batch_id IS NOT NULL")]
+        for batch_id in batches:
+            if self.outbox.status(batch_id)["status"] is not None:
+                with connect_db(self.db_path) as conn:
+                    items = conn.execute(
+                        "SELECT submission_id, summary, package_dir FROM digest_items WHERE batch_id = ?", (batch_id,)
+                    ).fetchall()
+                self._forget(batch_id, items)
+            else:
+                with connect_db(self.db_path) as conn:
+                    conn.execute("UPDATE digest_items SET batch_id = NULL WHERE batch_id = ?", (batch_id,))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="team-digest", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=10.0):
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            try:
+                while self.flush():
+                    pass
+                due_in = self._due_in()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Team digest failed: %s", e)
+                due_in = 30.0
+            self._wakeup.wait(30.0 if due_in is None else max(0.5, min(30.0, due_in)))
+            self._wakeup.clear()
+
+
+# Batches of team_digest_max submissions, or whatever waited team_digest_minutes
+def default_digest(outbox):
+    from notifications import digest_message
+    return TeamDigest(
+        os.path.join(DATA_DIR, "digest.sqlite3"),
+        os.path.join(DATA_DIR, "digest"),
+        outbox,
+        digest_message,
+        window=get_setting("team_digest_minutes", 15.0, float) * 60,
+        max_items=get_setting("team_digest_max", 25, int),
+    )
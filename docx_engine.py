@@ -0,0 +1,113 @@
+import functools
+import io
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from metrics import timed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_PATH = os.path.join(BASE_DIR, "resources", "submission_template.docx")
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Placeholders of the submission template, in document order (key, label)
+FIELDS = [
+    ("full_name", "Full Name"),
+    ("dob", "Date of Birth"),
+    ("gender", "Gender"),
+    ("country", "Country"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("address", "Address"),
+    ("previous_qualifications", "Previous Qualifications"),
+    ("current_institution", "Current Institution"),
+    ("course", "Course Interested In"),
+    ("learning_preferences", "Learning Preferences"),
+    ("special_requirements", "Special Requirements"),
+    ("emergency_contact", "Emergency Contact"),
+]
+
+SIGNATURE_NAME = "Signature"  # docPr name of the placeholder picture
+SIGNATURE_WIDTH_EMU = 1828800  # 2 inches, like the original doc.add_picture(width=Inches(2))
+
+DOCUMENT_PART = "word/document.xml"
+RELS_PART = "word/_rels/document.xml.rels"
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_LINE_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+
+
+def _xml_text(value):
+    text = _INVALID_XML_CHARS.sub("", str(value))
+    return escape(text).replace("\r\n", "\n").replace("\n", _LINE_BREAK)
+
+
+# A DOCX template parsed once: every part is kept as bytes and document.xml is split
+# into static segments around its placeholders, so filling it is a join and a zip write.
+class DocxTemplate:
+    def __init__(self, path):
+        with zipfile.ZipFile(path) as archive:
+            self._parts = [(info, archive.read(info.filename)) for info in archive.infolist()]
+        parts = {info.filename: data for info, data in self._parts}
+
+        document = parts[DOCUMENT_PART].decode("utf-8")
+        document, self.signature_part = self._mark_signature(document, parts[RELS_PART].decode("utf-8"))
+        pieces = _PLACEHOLDER.split(document)
+        self._static = pieces[0::2]  # Text between placeholders
+        self._fields = pieces[1::2]  # Placeholder names, in order
+        self.fields = sorted(set(self._fields) - {"signature_cx", "signature_cy"})
+
+    # Turn the size of the signature picture into placeholders and find its image part
+    @staticmethod
+    def _mark_signature(document, rels):
+        marker = document.find(f'name="{SIGNATURE_NAME}"')
+        if marker < 0:
+            return document, None
+        start = document.rfind("<w:drawing>", 0, marker)
+        end = document.find("</w:drawing>", marker)
+        drawing = re.sub(r'cx="\d+" cy="\d+"', 'cx="{{signature_cx}}" cy="{{signature_cy}}"', document[start:end])
+        rel_id = re.search(r'r:embed="([^"]+)"', drawing).group(1)
+        target = re.search(rf'<Relationship [^>]*Id="{rel_id}"[^>]*Target="([^"]+)"', rels)
+        if target is None:
+            target = re.search(rf'<Relationship [^>]*Target="([^"]+)"[^>]*Id="{rel_id}"', rels)
+        return document[:start] + drawing + document[end:], "word/" + target.group(1)
+
+    # Fill the template and return the DOCX as bytes
+    # signature is an optional (png_bytes, width_px, height_px) tuple
+    def render(self, values, signature=None):
+        values = {key: _xml_text(value) for key, value in values.items()}
+        if signature is not None:
+            png, width, height = signature
+            values["signature_cx"] = str(SIGNATURE_WIDTH_EMU)
+            values["signature_cy"] = str(int(SIGNATURE_WIDTH_EMU * height / max(width, 1)))
+        else:
+            values.setdefault("signature_cx", str(SIGNATURE_WIDTH_EMU))
+            values.setdefault("signature_cy", "0")
+
+        chunks = [self._static[0]]
+        for name, static in zip(self._fields, self._static[1:]):
+            chunks.append(values.get(name, ""))
+            chunks.append(static)
+        document = "".join(chunks).encode("utf-8")
+
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+            for info, data in self._parts:
+                if info.filename == DOCUMENT_PART:
+                    data = document
+                elif signature is not None and info.filename == self.signature_part:
+                    data = signature[0]
+                archive.writestr(info, data)
+        return out.getvalue()
+
+
+# The template is parsed once per process
+@functools.lru_cache(maxsize=None)
+def get_template(path=TEMPLATE_PATH):
+    return DocxTemplate(path)
+
+
+def render_submission(values, signature=None):
+    with timed("docx_render_seconds"):
+        return get_template().render(values, signature)
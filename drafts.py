@@ -0,0 +1,246 @@
+import base64
+import json
+import logging
+import os
+import secrets
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date
+from attachments import COPY_BUFFER_SIZE
+from config import DATA_DIR, connect_db, get_setting, init_db
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    token TEXT PRIMARY KEY,
+    step INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS draft_fields (
+    token TEXT NOT NULL REFERENCES drafts (token) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (token, name)
+);
+CREATE TABLE IF NOT EXISTS draft_files (
+    token TEXT NOT NULL REFERENCES drafts (token) ON DELETE CASCADE,
+    slot TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    PRIMARY KEY (token, slot)
+);
+CREATE INDEX IF NOT EXISTS drafts_updated ON drafts (updated_at);
+CREATE INDEX IF NOT EXISTS draft_files_sha256 ON draft_files (sha256);
+"""
+
+
+# Field values as JSON text; dates and signatures are tagged so they can be restored.
+# Raises TypeError for values that cannot be stored (e.g. UploadedFile widgets).
+def encode_value(value):
+    # Only loaded once someone reaches the signature step; another session may be halfway
+    # through importing it, but then no Signature exists yet either
+    Signature = getattr(sys.modules.get("signature"), "Signature", None)
+    if isinstance(value, date):
+        value = {"__date__": value.isoformat()}
+    elif Signature is not None and isinstance(value, Signature):
+        value = {"__signature__": base64.b64encode(value.bits.tobytes()).decode("ascii"), "width": value.width, "height": value.height}
+    return json.dumps(value, sort_keys=True)
+
+
+def _decode_hook(obj):
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    if "__signature__" in obj:
+        import numpy as np
+        from signature import Signature
+        bits = np.frombuffer(base64.b64decode(obj["__signature__"]), dtype=np.uint8)
+        return Signature(bits.reshape(obj["height"], -1), obj["width"], obj["height"])
+    return obj
+
+
+def decode_value(text):
+    return json.loads(text, object_hook=_decode_hook)
+
+
+# A draft read back from the store
+class Draft:
+    def __init__(self, token, step, fields, files):
+        self.token = token
+        self.step = step
+        self.fields = fields  # name -> value
+        self.files = files  # slot -> (sha256, name, type)
+
+
+# Server-side drafts of unfinished applications, keyed by a random resume token.
+# Field values are rows in SQLite and uploaded files are stored once per content hash
+# in a blob directory. save() is incremental: given the snapshot returned by the
+# previous save it only writes the fields and slots that changed since.
+class DraftStore:
+    def __init__(self, db_path, blob_dir, ttl=7 * 24 * 3600, purge_interval=3600.0):
+        self.db_path = db_path
+        self.blob_dir = blob_dir
+        self.ttl = ttl  # Seconds an untouched draft is kept
+        self.purge_interval = purge_interval  # Seconds between purges run by save()
+        self._purge_lock = threading.Lock()
+        self._next_purge = 0.0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        init_db(self.db_path, SCHEMA)
+
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(24)
+
+    def blob_path(self, sha256):
+        return os.path.join(self.blob_dir, sha256)
+
+    def _write_blob(self, attachment):
+        path = self.blob_path(attachment.sha256)
+        try:
+            # Same bytes already stored (by this or another draft). Touched so that it is
+            # within the grace period of a concurrent delete() or purge().
+            os.utime(path)
+            return
+        except FileNotFoundError:
+            pass
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        attachment.file.seek(0)  # In memory or spilled to disk (see session_memory)
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(attachment.file, f, COPY_BUFFER_SIZE)
+        os.replace(tmp_path, path)
+
+    # Save the draft; `fields` maps names to values and `attachments` is the session's
+    # AttachmentRegistry (slot -> Attachment). Returns the snapshot to pass next time.
+    def save(self, token, step, fields, attachments, previous=None):
+        previous = previous or {"fields": {}, "files": {}}
+        encoded = {}
+        for name, value in fields.items():
+            try:
+                encoded[name] = encode_value(value)
+            except TypeError:
+                continue
+        files = {slot: attachments.get(slot) for slot in attachments.slots()}
+
+        changed_fields = [(token, name, text) for name, text in encoded.items() if previous["fields"].get(name) != text]
+        changed_files = [(slot, a) for slot, a in files.items() if previous["files"].get(slot) != a.sha256]
+        removed_slots = [(token, slot) for slot in previous["files"] if slot not in files]
+        for _, attachment in changed_files:
+            self._write_blob(attachment)
+
+        now = time.time()
+        with connect_db(self.db_path, foreign_keys=True) as conn:
+            conn.execute(
+                "INSERT INTO drafts (token, step, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (token) DO UPDATE SET step = excluded.step, updated_at = excluded.updated_at",
+                (token, step, now, now),
+            )
+            conn.executemany(
+                "INSERT INTO draft_fields (token, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (token, name) DO UPDATE SET value = excluded.value",
+                changed_fields,
+            )
+            conn.executemany(
+                "INSERT INTO draft_files (token, slot, sha256, name, type) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (token, slot) DO UPDATE SET sha256 = excluded.sha256, name = excluded.name, type = excluded.type",
+                [(token, slot, a.sha256, a.name, a.type) for slot, a in changed_files],
+            )
+            conn.executemany("DELETE FROM draft_files WHERE token = ? AND slot = ?", removed_slots)
+        self._purge_if_due()
+        return {"fields": encoded, "files": {slot: a.sha256 for slot, a in files.items()}}
+
+    # Load a draft, or None if the token is unknown or expired
+    def load(self, token):
+        with connect_db(self.db_path, foreign_keys=True) as conn:
+            row = conn.execute(
+                "SELECT step FROM drafts WHERE token = ? AND updated_at >= ?", (token, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            fields = conn.execute("SELECT name, value FROM draft_fields WHERE token = ?", (token,)).fetchall()
+            files = conn.execute("SELECT slot, sha256, name, type FROM draft_files WHERE token = ?", (token,)).fetchall()
+        values = {}
+        for name, text in fields:
+            try:
+                values[name] = decode_value(text)
+            except (ValueError, KeyError) as e:
+                logger.warning("Skipping unreadable draft field %s: %s", name, e)
+        return Draft(token, row[0], values, {slot: (sha256, name, type) for slot, sha256, name, type in files})
+
+    # Snapshot matching a loaded draft, so the next save only writes what changed
+    @staticmethod
+    def snapshot(draft):
+        return {
+            "fields": {name: encode_value(value) for name, value in draft.fields.items()},
+            "files": {slot: sha256 for slot, (sha256, _, _) in draft.files.items()},
+        }
+
+    def read_blob(self, sha256):
+        with open(self.blob_path(sha256), "rb") as f:
+            return f.read()
+
+    # Delete a draft and the files only it referred to
+    def delete(self, token):
+        with connect_db(self.db_path, foreign_keys=True) as conn:
+            hashes = {sha256 for (sha256,) in conn.execute("SELECT sha256 FROM draft_files WHERE token = ?", (token,))}
+            conn.execute("DELETE FROM drafts WHERE token = ?", (token,))
+            still_used = {
+                sha256 for (sha256,) in conn.execute(
+                    f"SELECT DISTINCT sha256 FROM draft_files WHERE sha256 IN ({', '.join('?' * len(hashes))})", tuple(hashes)
+                )
+            } if hashes else set()
+        self._remove_blobs(hashes - still_used)
+
+    # Drop expired drafts and the files no remaining draft refers to
+    def purge(self):
+        with self._purge_lock:
+            self._next_purge = time.monotonic() + self.purge_interval
+        with connect_db(self.db_path, foreign_keys=True) as conn:
+            removed = conn.execute("DELETE FROM drafts WHERE updated_at < ?", (time.time() - self.ttl,)).rowcount
+        self._remove_orphan_blobs()
+        return removed
+
+    # Drafts hold ID documents, so expired ones must not wait for a restart: the first
+    # save() after each purge_interval purges (a failure is retried next interval)
+    def _purge_if_due(self):
+        with self._purge_lock:
+            if time.monotonic() < self._next_purge:
+                return
+            self._next_purge = time.monotonic() + self.purge_interval
+        try:
+            self.purge()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Draft purge failed: %s", e)
+
+    def _remove_orphan_blobs(self):
+        with connect_db(self.db_path, foreign_keys=True) as conn:
+            referenced = {sha256 for (sha256,) in conn.execute("SELECT DISTINCT sha256 FROM draft_files")}
+        self._remove_blobs(set(os.listdir(self.blob_dir)) - referenced)
+
+    # Blobs younger than `grace` seconds are kept: a concurrent save may have written
+    # (or reused) the file but not yet committed the row referring to it
+    def _remove_blobs(self, names, grace=300):
+        cutoff = time.time() - grace
+        for name in names:
+            path = self.blob_path(name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+# Drafts kept for draft_ttl_days, purged on start and every draft_purge_minutes
+def default_drafts():
+    store = DraftStore(
+        os.path.join(DATA_DIR, "drafts.sqlite3"),
+        os.path.join(DATA_DIR, "drafts"),
+        ttl=get_setting("draft_ttl_days", 7.0, float) * 24 * 3600,
+        purge_interval=get_setting("draft_purge_minutes", 60.0, float) * 60,
+    )
+    store.purge()
+    return store
@@ -0,0 +1,100 @@
+import binascii
+import functools
+import os
+import re
+import uuid
+from html import escape
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "resources", "email")
+
+# {{ field }} placeholders in the template files
+FIELD_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+# Quoted-printable with CRLF line ends. Every piece ends in a line break (a soft one,
+# "=\r\n", unless the text itself ends a line), so encoded pieces can be concatenated
+# and still decode to the concatenated text.
+def _qp(text):
+    encoded = binascii.b2a_qp(text.encode("utf-8"), istext=True).replace(b"\n", b"\r\n")
+    if encoded and not encoded.endswith(b"\r\n"):
+        encoded += b"=\r\n"
+    return encoded
+
+
+# One alternative of a template (text/plain or text/html), compiled to the MIME part
+# with its static text already encoded; rendering encodes just the field values
+class CompiledPart:
+    def __init__(self, source, subtype, escape_value=str):
+        self.subtype = subtype
+        self.escape_value = escape_value
+        pieces = FIELD_PATTERN.split(source.replace("\r\n", "\n"))
+        self.chunks = [_qp(piece) for piece in pieces[0::2]]
+        self.fields = pieces[1::2]
+        self.header = (
+            f'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: quoted-printable\r\n"
+            "\r\n"
+        ).encode("ascii")
+
+    def render(self, values):
+        out = [self.header, self.chunks[0]]
+        for field, chunk in zip(self.fields, self.chunks[1:]):
+            out.append(_qp(self.escape_value(str(values.get(field, "")))))
+            out.append(chunk)
+        return b"".join(out)
+
+
+# An email body ready to be written: the MIME bytes (headers included) of its body part
+class RenderedBody:
+    def __init__(self, template, values, mime):
+        self.template = template
+        self.values = values
+        self.mime = mime
+
+    def mime_bytes(self):
+        return self.mime
+
+
+# Email body from resources/email/<name>.html and, if present, <name>.txt. Sent as
+# multipart/alternative (plain text first, so clients that can show HTML prefer it).
+class EmailTemplate:
+    def __init__(self, name, directory=TEMPLATE_DIR):
+        self.name = name
+        self.parts = []
+        text_path = os.path.join(directory, f"{name}.txt")
+        if os.path.exists(text_path):
+            with open(text_path, encoding="utf-8") as f:
+                self.parts.append(CompiledPart(f.read(), "plain"))
+        with open(os.path.join(directory, f"{name}.html"), encoding="utf-8") as f:
+            self.parts.append(CompiledPart(f.read(), "html", escape))
+
+        # "=" never appears unencoded in quoted-printable, so the boundary cannot occur in a part
+        boundary = f"=_{uuid.uuid4().hex}"
+        self.header = f'Content-Type: multipart/alternative;\r\n boundary="{boundary}"\r\n\r\n'.encode("ascii")
+        self.delimiter = f"\r\n--{boundary}\r\n".encode("ascii")
+        self.closing = f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    @property
+    def fields(self):
+        return sorted({field for part in self.parts for field in part.fields})
+
+    def render(self, **values):
+        if len(self.parts) == 1:
+            return RenderedBody(self.name, values, self.parts[0].render(values))
+        out = [self.header]
+        for part in self.parts:
+            out.append(self.delimiter)
+            out.append(part.render(values))
+        out.append(self.closing)
+        return RenderedBody(self.name, values, b"".join(out))
+
+
+# Templates are read and compiled once per process
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    return EmailTemplate(name)
+
+
+def render(name, **values):
+    return get_template(name).render(**values)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from config import DATA_DIR, connect_db, get_setting, init_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    submission_id TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_created ON fingerprints (created_at);
+"""
+
+
+# Compare values the way a person would: Unicode forms, case and spacing don't matter
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", value)).strip().casefold()
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+# Stable hash of a submission: its form values plus the SHA-256 of each attached file
+def submission_fingerprint(values, file_hashes=()):
+    payload = json.dumps(
+        {"values": _normalize(values), "files": sorted(file_hashes)},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Fingerprints of recent submissions (kept for `ttl` seconds), so a repeat of a
+# submission is answered with the original one instead of being processed again
+class FingerprintIndex:
+    def __init__(self, db_path, ttl=24 * 3600):
+        self.db_path = db_path
+        self.ttl = ttl
+        init_db(self.db_path, SCHEMA)
+
+    # Submission id recorded for the fingerprint, or None if there is no recent one
+    def lookup(self, fingerprint):
+        with connect_db(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT submission_id FROM fingerprints WHERE fingerprint = ? AND created_at >= ?",
+                (fingerprint, time.time() - self.ttl),
+            ).fetchone()
+        return row[0] if row else None
+
+    # Record the fingerprint for submission_id unless a recent submission has it already;
+    # returns the submission id that owns it (submission_id itself if we got it)
+    def reserve(self, fingerprint, submission_id):
+        now = time.time()
+        with connect_db(self.db_path) as conn:
+            conn.execute("DELETE FROM fingerprints WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint, submission_id, created_at) VALUES (?, ?, ?)",
+                (fingerprint, submission_id, now),
+            )
+            return conn.execute("SELECT submission_id FROM fingerprints WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
+
+    # Forget a reservation whose submission failed, so it can be sent again
+    def release(self, fingerprint, submission_id):
+        with connect_db(self.db_path) as conn:
+            conn.execute("DELETE FROM fingerprints WHERE fingerprint = ? AND submission_id = ?", (fingerprint, submission_id))
+
+
+# Submissions of the last duplicate_window_hours, seen by the app and batch_enrol.py
+def default_fingerprints():
+    return FingerprintIndex(
+        os.path.join(DATA_DIR, "fingerprints.sqlite3"),
+        ttl=get_setting("duplicate_window_hours", 24.0, float) * 3600,
+    )
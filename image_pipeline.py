@@ -0,0 +1,92 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import as_bool, get_setting
+
+logger = logging.getLogger(__name__)
+
+# Optional recompression of uploaded ID / address photos before they are emailed
+IMAGE_PROCESSING_ENABLED = get_setting("image_processing", False, as_bool)
+MAX_DIMENSION = get_setting("image_max_dimension", 2000, int)  # Longest side in pixels
+JPEG_QUALITY = get_setting("image_quality", 85, int)  # Starting JPEG quality
+MIN_JPEG_QUALITY = 50  # Never go below this, documents must stay legible
+MAX_BYTES = get_setting("image_max_bytes", 1024 * 1024, int)  # Size budget per image
+WORKERS = get_setting("image_workers", 2, int)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def _encode_jpeg(image, quality):
+    stream = io.BytesIO()
+    image.save(stream, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return stream.getvalue()
+
+
+# Runs in a worker process: auto-orient, downscale, re-encode within the size budget.
+# The output is written without EXIF (camera, GPS and orientation tags are dropped).
+def process_image(data, max_dimension=MAX_DIMENSION, quality=JPEG_QUALITY, max_bytes=MAX_BYTES):
+    from PIL import Image, ImageOps  # Only needed in the worker processes
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        # JPEG has no alpha channel, flatten transparent PNGs onto white
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        while True:
+            for q in range(quality, MIN_JPEG_QUALITY - 1, -10):
+                encoded = _encode_jpeg(image, q)
+                if len(encoded) <= max_bytes:
+                    return encoded
+            # Still over budget at the lowest quality, shrink and try again
+            if min(image.size) <= 256:
+                return encoded
+            image = image.resize((int(image.width * 0.75), int(image.height * 0.75)), Image.LANCZOS)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn, as forking the multi-threaded Streamlit server is unsafe
+                _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def is_processable(uploaded_file):
+    return IMAGE_PROCESSING_ENABLED and os.path.splitext(uploaded_file.name)[1].lower() in IMAGE_EXTENSIONS
+
+
+# Start processing an upload in the background; returns a Future (or None if not applicable)
+def submit(uploaded_file):
+    if not is_processable(uploaded_file):
+        return None
+    return get_executor().submit(process_image, uploaded_file.getvalue())
+
+
+# Wait for a submitted job and wrap its output, falling back to the original file on failure
+def result(future, uploaded_file, timeout=60):
+    if future is None:
+        return uploaded_file
+    try:
+        data = future.result(timeout=timeout)
+    except Exception as e:
+        logger.warning("Image processing of %s failed, sending original: %s", uploaded_file.name, e)
+        return uploaded_file
+    from mailer import InMemoryFile
+    name = os.path.splitext(uploaded_file.name)[0] + ".jpg"
+    return InMemoryFile(data, name, "image/jpeg")
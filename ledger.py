@@ -0,0 +1,158 @@
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from config import DATA_DIR, get_setting
+
+logger = logging.getLogger(__name__)
+
+# Ledger columns (key, header), in sheet order
+COLUMNS = [
+    ("submission_id", "Submission ID"),
+    ("submitted_at", "Submitted At"),
+    ("full_name", "Full Name"),
+    ("dob", "Date of Birth"),
+    ("gender", "Gender"),
+    ("country", "Country"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("address", "Address"),
+    ("previous_qualifications", "Previous Qualifications"),
+    ("current_institution", "Current Institution"),
+    ("course", "Course Interested In"),
+    ("learning_preferences", "Learning Preferences"),
+    ("special_requirements", "Special Requirements"),
+    ("emergency_contact", "Emergency Contact"),
+    ("attachments", "Attachments"),
+]
+
+
+def _text_cell(sheet, value):
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.data_type = "s"
+    return cell
+
+
+# Append-only ledger of completed submissions, one CSV journal and one XLSX per month.
+# record() only puts the row on a queue; a background thread batches rows, appends them
+# to the month's CSV and rebuilds that month's XLSX with openpyxl's write-only workbook.
+class SubmissionLedger:
+    def __init__(self, directory, flush_interval=30.0, batch_size=50):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def record(self, row):
+        row = dict(row)
+        row.setdefault("submitted_at", datetime.now().isoformat(timespec="seconds"))
+        self._queue.put_nowait(row)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="submission-ledger", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=10.0):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def paths(self, month):
+        base = os.path.join(self.directory, f"submissions-{month}")
+        return base + ".csv", base + ".xlsx"
+
+    def _worker(self):
+        pending = {}  # Month -> rows not yet in its CSV journal
+        stale = set()  # Months whose journal has rows their XLSX doesn't
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if row is None:
+                    stopping = True
+                else:
+                    pending.setdefault(row["submitted_at"][:7], []).append(row)
+            except queue.Empty:
+                pass
+            due = stopping or time.monotonic() >= deadline or sum(map(len, pending.values())) >= self.batch_size
+            if (pending or stale) and due:
+                self._write_pending(pending, stale)
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    # A month leaves `pending` as soon as its rows are in the journal and `stale` once its
+    # workbook is rebuilt; whatever fails is retried on the next interval, so a workbook
+    # that cannot be written never gets the same rows appended to the journal twice
+    def _write_pending(self, pending, stale):
+        for month in list(pending):
+            try:
+                self._append_csv(self.paths(month)[0], pending[month])
+            except Exception as e:
+                logger.warning("Ledger journal for %s failed (%s rows kept): %s", month, len(pending[month]), e)
+                continue
+            del pending[month]
+            stale.add(month)
+        for month in list(stale):
+            try:
+                self._write_xlsx(*self.paths(month))
+            except Exception as e:
+                logger.warning("Ledger workbook for %s failed: %s", month, e)
+                continue
+            stale.discard(month)
+
+    # Write a batch of rows, grouped by the month they were submitted in
+    def flush(self, rows):
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row["submitted_at"][:7], []).append(row)
+        for month, month_rows in by_month.items():
+            csv_path, xlsx_path = self.paths(month)
+            self._append_csv(csv_path, month_rows)
+            self._write_xlsx(csv_path, xlsx_path)
+
+    @staticmethod
+    def _append_csv(csv_path, rows):
+        new_file = not os.path.exists(csv_path)
+        with open(csv_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow([key for key, _ in COLUMNS])
+            for row in rows:
+                writer.writerow([row.get(key, "") for key, _ in COLUMNS])
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Rebuild the month's workbook from its journal, streaming rows (write-only mode).
+    # Every value is written as a string cell: applicants type these, and a value starting
+    # with "=" would otherwise be stored as a formula.
+    @staticmethod
+    def _write_xlsx(csv_path, xlsx_path):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Submissions")
+        sheet.append([header for _, header in COLUMNS])
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Journal header (column keys)
+            for values in reader:
+                sheet.append([_text_cell(sheet, value) for value in values])
+        tmp_path = xlsx_path + ".tmp"
+        workbook.save(tmp_path)
+        os.replace(tmp_path, xlsx_path)  # Readers never see a half-written workbook
+
+
+# One ledger per deployment, under data/ledger
+def default_ledger():
+    return SubmissionLedger(
+        os.path.join(DATA_DIR, "ledger"),
+        flush_interval=get_setting("ledger_flush_interval", 30.0, float),
+    )
@@ -0,0 +1,294 @@
+import base64
+import io
+import os
+import smtplib
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from email import policy
+from email.message import EmailMessage, MIMEPart
+from email.utils import formatdate, make_msgid
+from attachments import COPY_BUFFER_SIZE
+from config import as_bool, get_secret, get_setting
+from metrics import timed
+
+# Use Gmail SMTP server for sending the email by default (smtp.office365.com for outlook)
+SMTP_HOST = get_setting("smtp_host", "smtp.gmail.com")
+SMTP_PORT = get_setting("smtp_port", 587, int)
+
+# Attachments are read and base64 encoded this many bytes at a time (a multiple of the
+# 57 bytes that make up one 76 character base64 line)
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+
+# In-memory file that can be attached like an UploadedFile (name, type, read/seek)
+class InMemoryFile(io.BytesIO):
+    def __init__(self, data, name, type="application/octet-stream"):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+        self.size = len(data)
+
+
+def _write_headers(out, msg):
+    for name, value in msg.items():
+        out.write(policy.SMTP.fold_binary(name, value))
+    out.write(b"\r\n")
+
+
+# Copy a file object into the message as base64, one chunk at a time
+def _write_base64(out, fileobj):
+    while True:
+        chunk = fileobj.read(ATTACHMENT_CHUNK_SIZE)
+        if not chunk:
+            break
+        out.write(base64.encodebytes(chunk).replace(b"\n", b"\r\n"))
+
+
+# An email waiting to be sent. Nothing is serialized until write_to() streams the
+# MIME message (attachments included) into a file object. The body is an HTML string
+# or a body rendered from a template (email_templates), whose MIME bytes are ready.
+class OutgoingEmail:
+    def __init__(self, sender_email, receiver_email, subject, body, files=None, local_file_path=None):
+        self.sender_email = sender_email
+        self.receiver_email = list(receiver_email)
+        self.subject = subject
+        self.body = body
+        self.files = list(files or [])
+        self.local_file_path = local_file_path
+
+    def _body_bytes(self):
+        if isinstance(self.body, str):
+            body = MIMEPart(policy=policy.SMTP)
+            body.set_content(self.body, subtype='html')
+            return body.as_bytes(policy=policy.SMTP)
+        return self.body.mime_bytes()
+
+    def write_to(self, out):
+        headers = EmailMessage(policy=policy.SMTP)
+        headers['From'] = self.sender_email
+        headers['To'] = ", ".join(self.receiver_email)
+        headers['Subject'] = self.subject
+        headers['Date'] = formatdate(localtime=True)
+        headers['Message-ID'] = make_msgid()
+        headers['MIME-Version'] = '1.0'
+
+        # Without attachments the body part is the whole message
+        if not self.files and not self.local_file_path:
+            for name, value in headers.items():
+                out.write(policy.SMTP.fold_binary(name, value))
+            out.write(self._body_bytes())
+            return
+
+        boundary = f"==============={uuid.uuid4().hex}=="
+        headers['Content-Type'] = f'multipart/mixed; boundary="{boundary}"'
+        _write_headers(out, headers)
+
+        # Body
+        out.write(f"--{boundary}\r\n".encode())
+        out.write(self._body_bytes())
+
+        # Attach uploaded files
+        for uploaded_file in self.files:
+            uploaded_file.seek(0)  # Move to the beginning of the UploadedFile
+            self._write_attachment(out, boundary, uploaded_file, uploaded_file.name)
+
+        # Attach local file if specified
+        if self.local_file_path:
+            with open(self.local_file_path, 'rb') as f:
+                self._write_attachment(out, boundary, f, os.path.basename(self.local_file_path))
+
+        out.write(f"\r\n--{boundary}--\r\n".encode())
+
+    @staticmethod
+    def _write_attachment(out, boundary, fileobj, filename):
+        part = MIMEPart(policy=policy.SMTP)
+        part['Content-Type'] = 'application/octet-stream'
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        part['Content-Transfer-Encoding'] = 'base64'
+        out.write(f"\r\n--{boundary}\r\n".encode())
+        _write_headers(out, part)
+        _write_base64(out, fileobj)
+
+
+# Build the email (Handle Local + Uploaded attachments)
+def build_message(sender_email, receiver_email, subject, body, files=None, local_file_path=None):
+    return OutgoingEmail(sender_email, receiver_email, subject, body, files, local_file_path)
+
+
+# Yield an already assembled message in SMTP DATA form (dot-stuffed, terminated by ".")
+def _iter_data(fp):
+    buffer = bytearray()
+    line = b"\r\n"
+    for line in fp:
+        if line.startswith(b"."):
+            buffer += b"."
+        buffer += line
+        if len(buffer) >= COPY_BUFFER_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if not line.endswith(b"\r\n"):
+        buffer += b"\r\n"
+    buffer += b".\r\n"
+    yield bytes(buffer)
+
+
+# Run MAIL/RCPT/DATA streaming the message from fp instead of holding it in memory
+def _send_stream(server, fp, from_addr, to_addrs):
+    server.ehlo_or_helo_if_needed()
+    code, resp = server.mail(from_addr)
+    if code != 250:
+        _reset(server)
+        raise smtplib.SMTPSenderRefused(code, resp, from_addr)
+    refused = {}
+    for addr in to_addrs:
+        code, resp = server.rcpt(addr)
+        if code not in (250, 251):
+            refused[addr] = (code, resp)
+    if len(refused) == len(to_addrs):
+        _reset(server)
+        raise smtplib.SMTPRecipientsRefused(refused)
+    code, resp = server.docmd("data")
+    if code != 354:
+        _reset(server)
+        raise smtplib.SMTPDataError(code, resp)
+    for chunk in _iter_data(fp):
+        server.send(chunk)
+    code, resp = server.getreply()
+    if code != 250:
+        _reset(server)
+        raise smtplib.SMTPDataError(code, resp)
+    return refused
+
+
+def _reset(server):
+    try:
+        server.rset()
+    except smtplib.SMTPServerDisconnected:
+        pass
+
+
+# Process-wide pool of authenticated SMTP sessions. Sessions are kept alive between
+# messages, checked with NOOP before reuse and transparently replaced when dead, so
+# a submission no longer pays for a TLS handshake and LOGIN per email.
+class SMTPPool:
+    def __init__(self, host, port, max_idle_sessions=4, max_idle_seconds=120.0, timeout=30.0, starttls=True):
+        self.host = host
+        self.port = port
+        self.max_idle_sessions = max_idle_sessions
+        self.max_idle_seconds = max_idle_seconds  # Providers drop idle sessions after a few minutes
+        self.timeout = timeout
+        self.starttls = starttls
+        self._idle = {}  # sender_email -> list of (server, last_used)
+        self._lock = threading.Lock()
+
+    def _connect(self, sender_email, sender_password):
+        with timed("smtp_seconds", phase="connect"):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.starttls:
+                with timed("smtp_seconds", phase="starttls"):
+                    server.starttls()
+                    server.ehlo()
+            if sender_password:
+                with timed("smtp_seconds", phase="login"):
+                    server.login(sender_email, sender_password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_alive(server):
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    # Reuse an idle session that still answers NOOP, otherwise log in afresh
+    def _checkout(self, sender_email, sender_password):
+        while True:
+            with self._lock:
+                idle = self._idle.get(sender_email)
+                if not idle:
+                    break
+                server, last_used = idle.pop()
+            if time.monotonic() - last_used < self.max_idle_seconds and self._is_alive(server):
+                return server
+            self._close(server)
+        return self._connect(sender_email, sender_password)
+
+    def _checkin(self, sender_email, server):
+        with self._lock:
+            idle = self._idle.setdefault(sender_email, [])
+            if len(idle) < self.max_idle_sessions:
+                idle.append((server, time.monotonic()))
+                return
+        self._close(server)
+
+    @contextmanager
+    def session(self, sender_email, sender_password):
+        server = self._checkout(sender_email, sender_password)
+        try:
+            yield server
+        except BaseException:
+            # The session is in an unknown state after an error, never hand it out again
+            self._close(server)
+            raise
+        self._checkin(sender_email, server)
+
+    # Stream an assembled message from fp to its recipients
+    def send(self, fp, receiver_email, sender_email, sender_password):
+        start = fp.tell()
+        try:
+            with self.session(sender_email, sender_password) as server, timed("smtp_seconds", phase="send"):
+                return _send_stream(server, fp, sender_email, receiver_email)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server dropped a pooled session between NOOP and send; retry once on a fresh one
+            fp.seek(start)
+            with self.session(sender_email, sender_password) as server, timed("smtp_seconds", phase="send"):
+                return _send_stream(server, fp, sender_email, receiver_email)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for sessions in idle.values():
+            for server, _ in sessions:
+                self._close(server)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPPool(
+                    SMTP_HOST,
+                    SMTP_PORT,
+                    max_idle_sessions=get_setting("smtp_pool_size", 4, int),
+                    max_idle_seconds=get_setting("smtp_max_idle_seconds", 120.0, float),
+                    starttls=get_setting("smtp_starttls", True, as_bool),
+                )
+    return _pool
+
+
+# Send a message already assembled on disk (used by the outbox workers)
+def send_spooled_file(path, sender_email, receiver_email):
+    with open(path, 'rb') as fp:
+        get_smtp_pool().send(fp, receiver_email, sender_email or get_secret("sender_email"), get_secret("sender_password"))
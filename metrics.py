@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import as_bool, get_setting
+
+logger = logging.getLogger(__name__)
+
+# Timing of the hot paths (step rendering, DOCX build, signature PNG, SMTP, Submit),
+# aggregated into in-memory histograms. Off by default; when off timed() hands back a
+# shared no-op context manager, so the instrumented code pays one function call.
+ENABLED = get_setting("metrics", False, as_bool)
+LOG_TIMINGS = get_setting("metrics_log", False, as_bool)  # One JSON log line per timing
+METRICS_FILE = get_setting("metrics_file", None)  # Prometheus textfile, rewritten periodically
+METRICS_PORT = get_setting("metrics_port", None, int)  # Serve /metrics on this port
+METRICS_HOST = get_setting("metrics_host", "127.0.0.1")  # Local only unless set (e.g. 0.0.0.0)
+EXPORT_INTERVAL = get_setting("metrics_export_seconds", 15.0, float)
+
+PREFIX = "enrolment_"
+# Upper bounds (seconds) of the histogram buckets, from a fast rerun to a slow SMTP send
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    # Cumulative (le, count) pairs as in the Prometheus exposition format
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+_histograms = {}  # (name, sorted label items) -> Histogram
+_lock = threading.Lock()
+_collectors = []  # Callables returning (name, labels, value) gauges at export time
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def observe(name, seconds, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+    if LOG_TIMINGS:
+        logger.info(json.dumps({"metric": name, "seconds": round(seconds, 6), **labels}))
+
+
+@contextmanager
+def _timer(name, labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+# Time a block:  with timed("smtp_seconds", phase="login"): ...
+def timed(name, **labels):
+    if not ENABLED:
+        return _NOOP
+    return _timer(name, labels)
+
+
+# Add gauges computed at export time, e.g. the session memory figures
+def register_collector(collect):
+    _collectors.append(collect)
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+# All metrics in the Prometheus text exposition format
+def render():
+    with _lock:
+        snapshot = sorted(
+            (name, labels, list(h.cumulative()), h.sum, h.count) for (name, labels), h in _histograms.items()
+        )
+    lines = []
+    typed = set()
+    for name, labels, cumulative, total, count in snapshot:
+        metric = PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        for bound, value in cumulative:
+            lines.append(f"{metric}_bucket{_format_labels(labels, le=_format_bound(bound))} {value}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+    for collect in _collectors:
+        try:
+            gauges = list(collect())
+        except Exception as e:
+            logger.warning("Metrics collector failed: %s", e)
+            continue
+        for name, labels, value in gauges:
+            metric = PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} gauge")
+                typed.add(metric)
+            lines.append(f"{metric}{_format_labels(sorted(labels.items()))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# Write the metrics atomically, for node_exporter's textfile collector
+def write_file(path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+# Serve render() at /metrics from a daemon thread
+def serve(port, host=METRICS_HOST):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Only when an endpoint is configured
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a log line each
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+# Start the configured exporters (textfile writer thread and/or /metrics endpoint), once per process
+def start_exporters(path=METRICS_FILE, port=METRICS_PORT, interval=EXPORT_INTERVAL, host=METRICS_HOST):
+    global _started
+    with _start_lock:
+        if _started or not ENABLED:
+            return
+        _started = True
+    if port:
+        serve(port, host)
+        logger.info("Serving metrics on %s:%d/metrics", host, port)
+    if path:
+        def write_periodically():
+            while True:
+                try:
+                    write_file(path)
+                except OSError as e:
+                    logger.warning("Writing metrics to %s failed: %s", path, e)
+                time.sleep(interval)
+        threading.Thread(target=write_periodically, name="metrics-file", daemon=True).start()
@@ -0,0 +1,78 @@
+from datetime import date, datetime
+from html import escape
+from email_templates import render as render_template
+from mailer import build_message
+
+team_email = ["enquiry.aspirecraft@gmail.com"]
+
+subject_learner = "Thank You for Your Interest in Our Courses!"
+
+
+def subject_team(values):
+    return f"ICAN - Course: {values['course']} Country: {values['country']} Name: {values['full_name']} Submission Date: {date.today()}"
+
+
+# Thank-you email body (resources/email/learner.html and .txt)
+def body_learner(full_name):
+    return render_template("learner", full_name=full_name)
+
+
+# Team notification body (resources/email/team.html and .txt)
+def body_team():
+    return render_template("team")
+
+
+# Columns of the digest's summary table (key, header)
+DIGEST_COLUMNS = [
+    ("full_name", "Name"),
+    ("course", "Course"),
+    ("country", "Country"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("submitted_at", "Submitted"),
+]
+
+
+def subject_digest(summaries):
+    return f"ICAN - {len(summaries)} new submissions - {date.today()}"
+
+
+def body_digest(summaries):
+    header = "".join(f"<th>{escape(label)}</th>" for _, label in DIGEST_COLUMNS)
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{escape(str(summary.get(key, '')))}</td>" for key, _ in DIGEST_COLUMNS) + "</tr>"
+        for summary in summaries
+    )
+    return f"""
+<html>
+<body>
+    <p>{len(summaries)} ICAN forms submitted. The attached archive has one folder per submission with its form and documents.</p>
+    <table border="1" cellpadding="4" cellspacing="0">
+        <tr>{header}</tr>
+        {rows}
+    </table>
+</body>
+</html>
+"""
+
+
+# Summary of a submission for the team digest (see digest.py)
+def digest_summary(values):
+    return dict({key: values.get(key, "") for key, _ in DIGEST_COLUMNS}, submitted_at=datetime.now().strftime("%Y-%m-%d %H:%M"))
+
+
+# One email to the team for a batch of submissions, with the archive of their packages
+def digest_message(sender_email, summaries, archive_path):
+    return build_message(sender_email, team_email, subject_digest(summaries), body_digest(summaries), local_file_path=archive_path)
+
+
+# Email to team with attachments and thank you email to learner, as (label, OutgoingEmail) pairs.
+# team=False leaves out the team email (digest mode sends it in a batch instead).
+def submission_messages(sender_email, values, attachments, team=True):
+    learner_email = [values['email']]
+    messages = [
+        ("learner", build_message(sender_email, learner_email, subject_learner, body_learner(values['full_name']))),
+    ]
+    if team:
+        messages.insert(0, ("team", build_message(sender_email, team_email, subject_team(values), body_team(), attachments)))
+    return messages
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from config import DATA_DIR, connect_db, get_setting, init_db
+
+logger = logging.getLogger(__name__)
+
+# Delivery states of a queued message
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+# Seconds a worker waits after a database error before trying again
+DB_ERROR_DELAY = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submission_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    spool_path TEXT NOT NULL,
+    sender TEXT,
+    recipients TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_due ON messages (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS messages_submission ON messages (submission_id);
+"""
+
+
+# Persistent outbox: Submit only spools finished messages to disk and records them in
+# SQLite, a small pool of worker threads delivers them with retries and backoff.
+class Outbox:
+    def __init__(self, db_path, spool_dir, send, workers=2, max_attempts=6, base_delay=5.0, max_delay=600.0,
+                 claim_timeout=600.0):
+        self.db_path = db_path
+        self.spool_dir = spool_dir
+        self.send = send  # Callable taking (spool_path, sender, recipients)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.claim_timeout = claim_timeout  # Seconds after which a claimed message is due again
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._claim_lock = threading.Lock()
+        self._threads = []
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        init_db(self.db_path, SCHEMA)
+
+    # Spool the messages (label, OutgoingEmail) of one submission and queue them; returns the submission id
+    def enqueue(self, messages, submission_id=None):
+        submission_id = submission_id or uuid.uuid4().hex
+        now = time.time()
+        rows = []
+        for label, message in messages:
+            spool_path = os.path.join(self.spool_dir, f"{submission_id}-{label}.eml")
+            tmp_path = spool_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                message.write_to(f)  # Streams attachments straight to disk
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, spool_path)  # Atomic, so workers never see half-written files
+            rows.append((submission_id, label, spool_path, message.sender_email, json.dumps(message.receiver_email), PENDING, now, now, now))
+
+        with connect_db(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO messages (submission_id, label, spool_path, sender, recipients, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        self._wakeup.set()
+        return submission_id
+
+    # Delivery status of every message belonging to a submission
+    def status(self, submission_id):
+        with connect_db(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT label, status, attempts, last_error, updated_at FROM messages WHERE submission_id = ? ORDER BY id",
+                (submission_id,),
+            ).fetchall()
+        messages = [
+            {"label": label, "status": status, "attempts": attempts, "last_error": last_error, "updated_at": updated_at}
+            for label, status, attempts, last_error, updated_at in rows
+        ]
+        statuses = {m["status"] for m in messages}
+        if not messages:
+            overall = None
+        elif statuses == {SENT}:
+            overall = SENT
+        elif FAILED in statuses:
+            overall = FAILED
+        else:
+            overall = PENDING
+        return {"submission_id": submission_id, "status": overall, "messages": messages}
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"outbox-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # Take the next due message, marking it as being sent. Several processes may share the
+    # database (the app, batch_enrol.py --deliver), so the claim only succeeds if the row
+    # is still as we read it. A message claimed more than claim_timeout ago belongs to a
+    # process that died mid-delivery and is due again.
+    def _claim(self):
+        while True:
+            now = time.time()
+            with self._claim_lock, connect_db(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT id, spool_path, sender, recipients, attempts, status, updated_at FROM messages "
+                    "WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND updated_at < ?) "
+                    "ORDER BY next_attempt_at LIMIT 1",
+                    (PENDING, now, SENDING, now - self.claim_timeout),
+                ).fetchone()
+                if row is None:
+                    # Tell the caller how long it may sleep before something becomes due
+                    next_due = conn.execute(
+                        "SELECT MIN(next_attempt_at) FROM messages WHERE status = ?", (PENDING,)
+                    ).fetchone()[0]
+                    return None, next_due
+                claimed = conn.execute(
+                    "UPDATE messages SET status = ?, updated_at = ? WHERE id = ? AND status = ? AND updated_at = ?",
+                    (SENDING, now, row[0], row[5], row[6]),
+                ).rowcount
+            if claimed:
+                return row[:5], None
+            # Another process took it between our read and write; look again
+
+    def _backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)  # Jitter so retries don't arrive in lockstep
+
+    def _deliver(self, message_id, spool_path, sender, recipients, attempts):
+        attempts += 1
+        try:
+            self.send(spool_path, sender, json.loads(recipients))
+        except Exception as e:
+            now = time.time()
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            logger.warning("Outbox delivery of message %s failed (attempt %s): %s", message_id, attempts, e)
+            with connect_db(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE messages SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE id = ?",
+                    (status, attempts, str(e), now + self._backoff(attempts), now, message_id),
+                )
+            return
+
+        with connect_db(self.db_path) as conn:
+            conn.execute(
+                "UPDATE messages SET status = ?, attempts = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (SENT, attempts, time.time(), message_id),
+            )
+        try:
+            os.remove(spool_path)
+        except OSError:
+            pass
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            # A locked or busy database must not end the thread; back off and try again.
+            # A message whose status could not be written stays claimed until its claim
+            # times out.
+            try:
+                row, next_due = self._claim()
+                if row is not None:
+                    self._deliver(*row)
+                    continue
+            except sqlite3.Error as e:
+                logger.warning("Outbox database error: %s", e)
+                self._stopping.wait(DB_ERROR_DELAY)
+                continue
+            timeout = 30.0 if next_due is None else max(0.05, min(30.0, next_due - time.time()))
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+
+# The outbox the app and batch_enrol.py share
+def default_outbox(send):
+    return Outbox(
+        os.path.join(DATA_DIR, "outbox.sqlite3"),
+        os.path.join(DATA_DIR, "spool"),
+        send=send,
+        workers=get_setting("outbox_workers", 2, int),
+        max_attempts=get_setting("outbox_max_attempts", 6, int),
+        claim_timeout=get_setting("outbox_claim_timeout", 600.0, float),
+    )
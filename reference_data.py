@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from dialing_codes import DialingCodeTrie
+
+# Reference files shipped with the app (resolved next to this module so the
+# loader works regardless of the current working directory)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+COUNTRIES_PATH = os.path.join(BASE_DIR, "resources", "world-countries.json")
+SUBJECT_AREAS_PATH = os.path.join(BASE_DIR, "resources", "subject_area_list.txt")
+PHONE_LENGTHS_PATH = os.path.join(BASE_DIR, "resources", "phone_number_lengths.json")
+
+# Placeholder shown as the first option of every selectbox
+PLACEHOLDER = "Select"
+
+GENDERS = ["Male", "Female", "Other"]
+
+# The sub-options for each subject area, like Foundation, Undergraduate, etc.
+SUB_OPTIONS = [
+    "Foundation",
+    "Undergraduate",
+    "Pre-Masters",
+    "Postgraduate",
+    "PhD & Research",
+    "Professional development"
+]
+
+# Learning modes (these are hypothetical, but you can adjust them to your case)
+LEARNING_MODES = ["Online", "Blended", "On-Campus"]
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    countries: dict  # Country name -> dialing code
+    country_names: list  # ["Select"] + sorted country names
+    subject_areas: list  # Subject areas in file order
+    subject_area_options: list  # ["Select"] + sorted subject areas
+    dialing_codes: DialingCodeTrie = field(compare=False)  # Longest-prefix lookup of the number's country
+    mtimes: tuple = field(default=(), compare=False)  # Source file mtimes used for reloads
+
+    def dialing_code(self, country):
+        return self.countries.get(country, "")
+
+    # Countries whose dialing code the phone number starts with (empty set if none)
+    def countries_for_phone(self, phone):
+        return self.dialing_codes.match(phone)[1]
+
+
+# Process-wide cache, shared by every session and rerun
+_cache = None
+_lock = threading.Lock()
+
+
+def _file_mtimes():
+    return tuple(os.stat(path).st_mtime_ns for path in (COUNTRIES_PATH, SUBJECT_AREAS_PATH, PHONE_LENGTHS_PATH))
+
+
+def _build(mtimes):
+    # Load country names and dialing codes from the JSON file
+    with open(COUNTRIES_PATH, encoding="utf-8") as file:
+        countries = {entry['name']: entry['dialing_code'] for entry in json.load(file)}
+    country_names = [PLACEHOLDER] + sorted(countries)
+
+    # Digits allowed after each dialing code, indexed together with the codes in a trie
+    with open(PHONE_LENGTHS_PATH, encoding="utf-8") as file:
+        phone_lengths = json.load(file)
+
+    # Load subject areas from the text file (skipping blank lines)
+    with open(SUBJECT_AREAS_PATH, encoding="utf-8") as file:
+        subject_areas = [line.strip() for line in file if line.strip()]
+    subject_area_options = [PLACEHOLDER] + sorted(subject_areas)
+
+    return ReferenceData(
+        countries=countries,
+        country_names=country_names,
+        subject_areas=subject_areas,
+        subject_area_options=subject_area_options,
+        dialing_codes=DialingCodeTrie(countries, phone_lengths),
+        mtimes=mtimes,
+    )
+
+
+# Return the parsed reference data, re-reading the files only when they change on disk
+def get_reference_data():
+    global _cache
+    mtimes = _file_mtimes()
+    cached = _cache
+    if cached is not None and cached.mtimes == mtimes:
+        return cached
+    with _lock:
+        if _cache is None or _cache.mtimes != mtimes:
+            _cache = _build(mtimes)
+        return _cache
@@ -0,0 +1,195 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from attachments import COPY_BUFFER_SIZE
+from config import DATA_DIR, get_setting
+
+logger = logging.getLogger(__name__)
+
+# Gauge name and stats() key of each per-session figure exported
+PER_SESSION_GAUGES = [
+    ("session_memory_bytes_by_session", "memory_bytes"),
+    ("session_spilled_bytes_by_session", "spilled_bytes"),
+    ("session_idle_seconds", "idle_seconds"),
+    ("session_evicted", "evicted"),
+]
+
+
+# Disk-backed stand-in for an uploaded file whose bytes were moved out of memory.
+# Behaves like an UploadedFile for the code reading attachments (name, type, size,
+# read/seek/getvalue); the anonymous temp file disappears when it is closed.
+class SpilledFile:
+    def __init__(self, source, directory):
+        self.name = source.name
+        self.type = getattr(source, "type", None)
+        self._file = tempfile.TemporaryFile(dir=directory)
+        source.seek(0)
+        shutil.copyfileobj(source, self._file, COPY_BUFFER_SIZE)
+        self.size = self._file.tell()
+        self._file.seek(0)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def getvalue(self):
+        self._file.seek(0)
+        return self._file.read()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def close(self):
+        self._file.close()
+
+
+# What the governor knows about one session
+class SessionUsage:
+    def __init__(self, attachments):
+        # The session's AttachmentRegistry; weak, so sessions Streamlit has dropped are forgotten
+        self._attachments = weakref.ref(attachments)
+        self.other_bytes = 0  # Reported by the session (signature, ...)
+        self.last_seen = time.monotonic()
+        self.evicted = False
+
+    @property
+    def attachments(self):
+        return self._attachments()
+
+    @property
+    def memory_bytes(self):
+        attachments = self.attachments
+        return self.other_bytes + (attachments.memory_bytes if attachments is not None else 0)
+
+    @property
+    def spilled_bytes(self):
+        attachments = self.attachments
+        return attachments.spilled_bytes if attachments is not None else 0
+
+
+# Process-wide accounting of what sessions hold in memory. Every run of a session
+# reports to track(): uploads larger than `spill_threshold` are moved to temp files
+# (and Streamlit's own copy of the upload is dropped), and sessions idle for longer
+# than `idle_ttl` have their uploads released. Idle sessions are swept from track()
+# calls of other sessions, at most every `sweep_interval` seconds.
+class MemoryGovernor:
+    def __init__(self, spill_dir, spill_threshold=512 * 1024, idle_ttl=30 * 60, sweep_interval=60):
+        self.spill_dir = spill_dir
+        self.spill_threshold = spill_threshold
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._sessions = {}  # session_id -> SessionUsage
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+    # Record a run of a session; returns True if its uploads were evicted while it was idle
+    def track(self, session_id, attachments, other_bytes=0, uploaded_file_mgr=None):
+        with self._lock:
+            usage = self._sessions.get(session_id)
+            if usage is None or usage.attachments is not attachments:
+                usage = self._sessions[session_id] = SessionUsage(attachments)
+            usage.other_bytes = other_bytes
+            usage.last_seen = time.monotonic()
+            evicted, usage.evicted = usage.evicted, False
+        self.spill(session_id, attachments, uploaded_file_mgr)
+        self.sweep()
+        return evicted
+
+    # Move the session's large uploads to disk
+    def spill(self, session_id, attachments, uploaded_file_mgr=None):
+        for attachment in attachments.files():
+            if attachment.spilled or attachment.size <= self.spill_threshold:
+                continue
+            file_id = getattr(attachment.file, "file_id", None)
+            try:
+                attachment.spill(self.spill_dir)
+            except OSError as e:
+                logger.warning("Spilling %s to disk failed: %s", attachment.name, e)
+                continue
+            # The uploader widget keeps the upload's bytes in Streamlit's file manager
+            # as well; the uploader shows the file as removed from then on
+            if uploaded_file_mgr is not None and file_id is not None:
+                uploaded_file_mgr.remove_file(session_id, file_id)
+
+    # Release the uploads of sessions idle for longer than idle_ttl
+    def sweep(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sweep < self.sweep_interval:
+                return 0
+            self._last_sweep = now
+            evicted = 0
+            for session_id, usage in list(self._sessions.items()):
+                attachments = usage.attachments
+                if attachments is None:
+                    del self._sessions[session_id]  # Session closed by Streamlit
+                elif not usage.evicted and now - usage.last_seen > self.idle_ttl:
+                    attachments.clear()
+                    usage.evicted = True
+                    evicted += 1
+                    logger.info("Released the uploads of idle session %s", session_id)
+        return evicted
+
+    # Bytes held by one session
+    def usage(self, session_id):
+        with self._lock:
+            usage = self._sessions.get(session_id)
+        if usage is None:
+            return {"memory_bytes": 0, "spilled_bytes": 0}
+        return {"memory_bytes": usage.memory_bytes, "spilled_bytes": usage.spilled_bytes}
+
+    # Totals over all sessions, with the per-session figures
+    def stats(self):
+        with self._lock:
+            sessions = dict(self._sessions)
+        per_session = {
+            session_id: {
+                "memory_bytes": usage.memory_bytes,
+                "spilled_bytes": usage.spilled_bytes,
+                "idle_seconds": round(time.monotonic() - usage.last_seen, 1),
+                "evicted": int(usage.evicted),  # 1 once its uploads were released while idle
+            }
+            for session_id, usage in sessions.items()
+        }
+        return {
+            "sessions": len(per_session),
+            "memory_bytes": sum(s["memory_bytes"] for s in per_session.values()),
+            "spilled_bytes": sum(s["spilled_bytes"] for s in per_session.values()),
+            "per_session": per_session,
+        }
+
+    # (name, labels, value) gauges for the metrics exporters: the totals, then each
+    # session's figures labelled with its session id (gone once the session closes)
+    def gauges(self):
+        stats = self.stats()
+        yield "sessions", {}, stats["sessions"]
+        yield "session_memory_bytes", {}, stats["memory_bytes"]
+        yield "session_spilled_bytes", {}, stats["spilled_bytes"]
+        per_session = stats["per_session"]
+        for name, key in PER_SESSION_GAUGES:
+            for session_id, figures in per_session.items():
+                yield name, {"session": session_id}, figures[key]
+
+
+# Uploads over spill_threshold_kb go to data/spill, sessions idle for
+# session_idle_minutes are released
+def default_governor():
+    return MemoryGovernor(
+        os.path.join(DATA_DIR, "spill"),
+        spill_threshold=get_setting("spill_threshold_kb", 512, int) * 1024,
+        idle_ttl=get_setting("session_idle_minutes", 30.0, float) * 60,
+    )
@@ -0,0 +1,69 @@
+import io
+import numpy as np
+from PIL import Image
+from metrics import timed
+
+MARGIN = 8  # White border (px) kept around the cropped strokes
+
+
+# Compact signature: the strokes cropped to their bounding box and stored as a 1-bit
+# bitmap (a few hundred bytes instead of the 150x600x4 canvas array). The PNG used on
+# the review page and in the DOCX is encoded once and cached.
+class Signature:
+    def __init__(self, bits, width, height):
+        self.bits = bits  # np.packbits of the ink mask, one padded row per line
+        self.width = width
+        self.height = height
+        self._png = None
+
+    # Build from st_canvas image_data (RGBA, transparent where nothing was drawn).
+    # Returns None for a blank canvas.
+    @classmethod
+    def from_canvas(cls, image_data):
+        if image_data is None or image_data.size == 0:
+            return None
+        ink = image_data[:, :, 3] > 0  # Anything the pen touched has some alpha
+        rows = np.flatnonzero(ink.any(axis=1))
+        if rows.size == 0:
+            return None
+        cols = np.flatnonzero(ink.any(axis=0))
+        mask = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        mask = np.pad(mask, MARGIN)
+        height, width = mask.shape
+        return cls(np.packbits(mask, axis=1), width, height)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Signature)
+            and self.width == other.width
+            and self.height == other.height
+            and np.array_equal(self.bits, other.bits)
+        )
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    # Bitmap plus the cached PNG, as counted by the session memory governor
+    @property
+    def memory_bytes(self):
+        return self.bits.nbytes + len(self._png or b"")
+
+    @property
+    def png(self):
+        if self._png is None:
+            # In PIL's "1" mode a set bit is white, so invert the ink mask
+            with timed("signature_png_seconds"):
+                image = Image.frombytes("1", (self.width, self.height), np.invert(self.bits).tobytes())
+                stream = io.BytesIO()
+                image.save(stream, format="PNG", optimize=True)
+                self._png = stream.getvalue()
+        return self._png
+
+
+# Keep the existing object (and its cached PNG) while the canvas content is unchanged
+def update_signature(current, image_data):
+    signature = Signature.from_canvas(image_data)
+    if signature is not None and signature == current:
+        return current
+    return signature
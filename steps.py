@@ -0,0 +1,687 @@
+import logging
+import uuid
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.uploaded_file_manager import DeletedFile
+from datetime import datetime, date
+import image_pipeline
+from assets import asset_url
+from attachments import ADDRESS_PROOF, BACK_ID, FRONT_ID
+from metrics import register_collector, timed
+from reference_data import GENDERS, LEARNING_MODES, PLACEHOLDER, SUB_OPTIONS, get_reference_data
+from validators import is_valid_email, validate_phone_number
+from wizard import Step, Wizard, checked, chosen, required
+
+logger = logging.getLogger(__name__)
+
+# The steps of the enrolment form, declared once per process (this module is imported,
+# not re-executed on every rerun like app.py), so their checks are only built once.
+# Input widgets use their session field as key: the value is in st.session_state before
+# the Next/Back callbacks run, and typing only reruns the step's fragment.
+# Heavy dependencies (canvas component, numpy/PIL, python-docx templating, SMTP, openpyxl)
+# are imported inside the steps that use them, keeping process start and the first
+# page fast; benchmarks/bench_startup.py tracks this.
+
+
+# Durable outbox shared by every session: Submit only enqueues, worker threads deliver
+@st.cache_resource
+def get_outbox():
+    from mailer import send_spooled_file
+    from outbox import default_outbox
+    outbox = default_outbox(send=send_spooled_file)
+    outbox.start()
+    return outbox
+
+# Team notifications collected into digest emails (team_digest setting); None when off
+@st.cache_resource
+def get_digest():
+    from digest import DIGEST_ENABLED, default_digest
+    if not DIGEST_ENABLED:
+        return None
+    digest = default_digest(get_outbox())
+    digest.start()
+    return digest
+
+# Local archive of submission packages (submission_archive setting); None when off
+@st.cache_resource
+def get_archive():
+    from archive import ARCHIVE_ENABLED, default_archive
+    return default_archive() if ARCHIVE_ENABLED else None
+
+# Limits on concurrent and repeated submissions, shared by every session (see admission)
+@st.cache_resource
+def get_admission():
+    from admission import default_admission
+    admission = default_admission()
+    register_collector(admission.gauges)
+    return admission
+
+# Fingerprints of recent submissions, to answer repeats with the original (see fingerprints)
+@st.cache_resource
+def get_fingerprints():
+    from fingerprints import default_fingerprints
+    return default_fingerprints()
+
+# Monthly XLSX/CSV ledger of completed submissions, written in the background
+@st.cache_resource
+def get_ledger():
+    from ledger import default_ledger
+    ledger = default_ledger()
+    ledger.start()
+    return ledger
+
+
+# Query parameter holding the resume token of the session's draft
+DRAFT_PARAM = "draft"
+
+# Server-side drafts of unfinished applications (answers in SQLite, uploads by hash)
+@st.cache_resource
+def get_drafts():
+    from drafts import default_drafts
+    return default_drafts()
+
+# Snapshot the answers and uploads whenever the applicant moves to another step; only
+# what changed since the previous snapshot is written
+def save_draft(state):
+    if state.get("submission_done") or state.step <= 1:
+        return
+    try:
+        drafts = get_drafts()
+        if not state.get("draft_token"):
+            state.draft_token = drafts.new_token()
+            st.query_params[DRAFT_PARAM] = state.draft_token  # A reload of the page resumes the draft
+        fields = {field: state.get(field) for field in wizard.fields()}
+        state.draft_snapshot = drafts.save(state.draft_token, state.step, fields, state.attachments, state.get("draft_snapshot"))
+    except Exception as e:
+        # Drafts are a convenience, never block the form on them
+        logger.warning("Saving draft failed: %s", e)
+
+# Restore a new session from the draft named in the URL, if there is one
+def restore_draft(state):
+    token = st.query_params.get(DRAFT_PARAM)
+    if not token or 'step' in state:
+        return
+    drafts = get_drafts()
+    draft = drafts.load(token)
+    if draft is None:
+        del st.query_params[DRAFT_PARAM]  # Unknown or expired
+        return
+    fields = set(wizard.fields())
+    for name, value in draft.fields.items():
+        if name in fields:
+            state[name] = value
+    restore_draft_files(state, drafts, draft)
+    state.step = min(draft.step, len(wizard))
+    state.draft_token = token
+    state.draft_snapshot = drafts.snapshot(draft)
+    st.toast("Welcome back! Your saved answers have been restored.")
+
+def restore_draft_files(state, drafts, draft):
+    from mailer import InMemoryFile
+    for slot, (sha256, name, type) in draft.files.items():
+        try:
+            data = drafts.read_blob(sha256)
+        except OSError:
+            continue
+        state.attachments.put(slot, InMemoryFile(data, name, type), on_new=image_pipeline.submit)
+
+# The finished application no longer needs its draft
+def discard_draft(state):
+    if state.get("draft_token"):
+        try:
+            get_drafts().delete(state.draft_token)
+        except Exception as e:
+            logger.warning("Deleting draft failed: %s", e)
+        state.draft_token = None
+        st.query_params.pop(DRAFT_PARAM, None)
+
+
+# Accounting of the memory held by sessions (large uploads spilled to disk, uploads of
+# idle sessions released); see session_memory
+@st.cache_resource
+def get_governor():
+    from session_memory import default_governor
+    governor = default_governor()
+    register_collector(governor.gauges)  # Exported with the timings, see metrics
+    return governor
+
+# Report this session to the governor on every run. Uploads released while the session
+# sat idle are reloaded from its draft (saved on every step change).
+def track_memory(state):
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    signature = state.get("signature")
+    other_bytes = signature.memory_bytes if signature is not None else 0
+    if not get_governor().track(ctx.session_id, state.attachments, other_bytes, ctx.uploaded_file_mgr):
+        return
+    draft = get_drafts().load(state.draft_token) if state.get("draft_token") else None
+    if draft is not None:
+        restore_draft_files(state, get_drafts(), draft)
+    elif state.get("step", 1) > 1:
+        st.warning("Your uploaded documents were cleared after a period of inactivity. Please upload them again.")
+
+
+# Uploader widget of a slot. Its key changes when an upload is rejected, which gives
+# the applicant an empty uploader again.
+def upload_widget(slot, label):
+    generation = st.session_state.get(f"{slot}_upload_generation", 0)
+    return st.file_uploader(label, type=["jpg", "png", "pdf", "docx"], key=f"{slot}_upload_{generation}")
+
+
+# Remember the document uploaded into a slot (and start recompressing it in the background if it is a photo).
+# Uploads are checked first (see upload_admission); a rejected one is dropped before it
+# reaches the session's attachments, and the uploader is reset.
+def add_uploaded_file(slot, uploaded_file):
+    from upload_admission import UploadRejected, check_upload
+    state = st.session_state
+    # DeletedFile: the upload's bytes were dropped from Streamlit's file manager after
+    # being spilled to disk (see session_memory), the registry still holds them
+    if isinstance(uploaded_file, DeletedFile):
+        uploaded_file = None
+    if uploaded_file is not None and not state.attachments.is_current(slot, uploaded_file):
+        try:
+            sha256 = check_upload(slot, uploaded_file, state.attachments)
+        except UploadRejected as e:
+            ctx = get_script_run_ctx()
+            if ctx is not None:
+                ctx.uploaded_file_mgr.remove_file(ctx.session_id, uploaded_file.file_id)
+            uploaded_file.close()
+            state[f"{slot}_upload_generation"] = state.get(f"{slot}_upload_generation", 0) + 1
+            state[f"{slot}_rejected"] = str(e)
+            st.rerun()
+        state.attachments.put(slot, uploaded_file, on_new=image_pipeline.submit, sha256=sha256)
+    rejected = state.pop(f"{slot}_rejected", None)
+    if rejected:
+        st.error(rejected)
+    # Show what is already held for the slot (the uploader is empty again after going Back)
+    attachment = st.session_state.attachments.get(slot)
+    if attachment is not None and uploaded_file is None:
+        st.caption(f"Uploaded: {attachment.name}")
+
+
+def is_signature_drawn(signature):
+    # Blank canvases never produce a Signature (see Signature.from_canvas)
+    from signature import Signature
+    return isinstance(signature, Signature) and signature.nbytes > 0
+
+
+def course_info(state):
+    if state.get('selected_course'):
+        course = state.selected_course
+        return f"{course['subject_area']} - {course['course_level']} ({course['learning_mode']})"
+    return "None"
+
+
+# Step 1: Welcome
+def render_welcome():
+    # Animated WebP built by tools/build_assets.py, served from static/ and cached by the browser
+    st.markdown(f'<img src="{asset_url("welcome")}" alt="AspireCraft" style="width:100%;">', unsafe_allow_html=True)
+    # st.image(Image.open('resources/logo.png').resize((500, 300)), use_column_width=True)
+
+    st.title("WELCOME TO ASPIRECRAFT!")
+    st.write("""
+    At AspireCraft, we believe in unlocking potential and creating opportunities for lifelong learning.
+    Our international CPD and accredited qualifications are designed to empower you with the skills and knowledge needed to excel in your chosen field.
+
+    We are excited to have you on board and look forward to supporting your journey towards achieving UK accreditation.
+
+    Let's get started with your enrolment process. It's simple and straightforward. Please proceed by filling out the following fields one at a time.
+    Click 'Next' to begin your journey with AspireCraft!
+    """)
+
+
+# Step 2: Personal Information
+def render_personal_info():
+    st.title("> 1: Personal Information")
+
+    # The widget key is the session field, so the value is kept between steps
+    st.text_input(
+        "Please enter your full name as it appears on your official documents.",
+        key="personal_info"
+    )
+
+
+# Step 3: Date of Birth
+def render_dob():
+    st.title("> 2: Date of Birth")
+    # Check if dob is a string and convert it back to a date object
+    if isinstance(st.session_state.get("dob"), str):
+        st.session_state.dob = datetime.strptime(st.session_state.get("dob"), "%d-%m-%Y").date()
+
+    # Date of Birth
+    st.date_input(
+        label="Date of Birth",  # Label for the field
+        key="dob",  # Stored in st.session_state.dob
+        min_value=date(1900, 1, 1),  # Minimum selectable date
+        max_value=date.today(),  # Maximum selectable date
+        help="Choose a date",  # Tooltip text
+        format='DD/MM/YYYY'
+    )
+
+
+# Step 4: Gender
+def render_gender():
+    st.title("> 3: Gender")
+
+    # Select gender using the selectbox, retaining the previous value
+    st.selectbox("Please select your gender.", [PLACEHOLDER] + GENDERS, key="gender")
+
+
+# Step 5: Country selection
+def render_country():
+    st.title("> 4: Country")
+    reference_data = get_reference_data()
+
+    # Select country using the selectbox, retaining the previous value
+    st.selectbox("Please select your country.", reference_data.country_names, key="country")
+
+
+# Step 6: Contact Information
+def render_contact():
+    st.title("> 5: Contact Information")
+    reference_data = get_reference_data()
+
+    # Get the selected country's dialing code
+    selected_dialing_code = reference_data.dialing_code(st.session_state.country)
+
+    # Input fields for contact information
+    st.text_input("Please enter your email address where we can reach you.", key="email")
+
+    # Display the country dialing code before the phone number input
+    st.text_input(
+        f"Please enter your WhatsApp number (international format starting with {selected_dialing_code} for {st.session_state.country}):",
+        key="phone"
+    )
+
+    # Offer to correct the country when the number belongs to a different one
+    phone_countries = reference_data.countries_for_phone(st.session_state.phone)
+    if phone_countries and st.session_state.country not in phone_countries:
+        st.info(f"This number looks like it is from {' / '.join(sorted(phone_countries))}, not {st.session_state.country}.")
+        for name in sorted(phone_countries):
+            st.button(f"Change country to {name}", key=f"use_country_{name}", on_click=use_country, args=(name,))
+
+    # Display the WhatsApp call availability message
+    st.markdown(
+        """
+        ### Ensure WhatsApp Call Availability:
+        We may contact you via WhatsApp. Please make sure your phone number is connected to WhatsApp and can receive international calls.
+        """
+    )
+    # Display clickable images in a single line (icons served from static/, see assets.py)
+    st.write("Download WhatsApp for your device:")
+
+    st.markdown(
+        f"""
+        <div style="display: flex; justify-content: space-around; align-items: center;">
+            <a href="https://play.google.com/store/apps/details?id=com.whatsapp" target="_blank">
+                <img src="{asset_url('icon_android')}" alt="Download for Android" style="width:100px;height:100px;margin:10px;">
+            </a>
+            <a href="https://apps.apple.com/app/whatsapp-messenger/id310633997" target="_blank">
+                <img src="{asset_url('icon_ios')}" alt="Download for iOS" style="width:100px;height:100px;margin:10px;">
+            </a>
+            <a href="https://get.microsoft.com/installer/download/9NKSQGP7F2NH" target="_blank">
+                <img src="{asset_url('icon_windows')}" alt="Download for Windows" style="width:100px;height:100px;margin:10px;">
+            </a>
+            <a href="https://web.whatsapp.com/desktop/mac_native/release/?configuration=Release" target="_blank">
+                <img src="{asset_url('icon_mac')}" alt="Download for Mac" style="width:100px;height:100px;margin:10px;">
+            </a>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # Input for address
+    st.text_area("Please enter your complete mailing address.", key="address")
+
+
+def use_country(name):
+    st.session_state.country = name
+
+
+def check_contact(state):
+    if not (state.phone and state.email and state.address):
+        return "Please fill out all the contact information fields before proceeding."
+    if not is_valid_email(state.email):
+        return "Please enter a valid email address."
+    is_valid, message = validate_phone_number(state.phone, get_reference_data().dialing_code(state.country))
+    if not is_valid:
+        return message
+
+
+# Step 7: Educational Background
+def render_education():
+    st.title("> 6: Educational Background")
+
+    # Input fields keyed by their session fields
+    st.text_area("Please list your previous qualifications.", key="previous_qualifications")
+    st.text_input(
+        "Please enter the name of your current educational institution (if applicable, else put 'none').",
+        key="current_institution"
+    )
+
+
+# Step 8: Course Information (with Subject Areas, Sub-options, and Learning Modes)
+def render_course():
+    st.title("> 7: Course Information")
+    reference_data = get_reference_data()
+
+    # Subject area selection
+    st.selectbox(
+        "Please select the subject area.",
+        reference_data.subject_area_options,  # Subject areas loaded from the text file (pre-sorted)
+        key="subject_area"
+    )
+
+    # Sub-option selection based on the selected subject area
+    st.selectbox("Please select your course level.", [PLACEHOLDER] + SUB_OPTIONS, key="sub_option")
+
+    # Learning mode selection
+    st.selectbox("Please select the learning mode.", [PLACEHOLDER] + LEARNING_MODES, key="learning_mode")
+
+
+# Store the selected subject area, course level, and learning mode
+def select_course(state):
+    state.selected_course = {
+        'subject_area': state.subject_area,
+        'course_level': state.sub_option,
+        'learning_mode': state.learning_mode
+    }
+
+
+# Step 9: Identification Documents
+def render_id_documents():
+    st.title("> 8: Identification Documents")
+    st.text("(*Upload of any 1 document is mandatory)")
+
+    # Upload front and back of the document
+    # The uploads live in the attachment registry only, not in session fields
+    front = upload_widget(FRONT_ID, "Please upload a scan or photo of the front of your passport or ID.")
+    add_uploaded_file(FRONT_ID, front)
+
+    back = upload_widget(BACK_ID, "Please upload a scan or photo of the back of your passport or ID.")
+    add_uploaded_file(BACK_ID, back)
+
+
+def check_id_documents(state):
+    if FRONT_ID not in state.attachments and BACK_ID not in state.attachments:
+        return "Please upload the front or back of your identification document before proceeding."
+
+
+# Step 10: Proof of Address
+def render_address_proof():
+    st.title("> 9: Proof of Address")
+    address_proof = upload_widget(ADDRESS_PROOF, "*Please upload a scan or photo of your proof of address.")
+    add_uploaded_file(ADDRESS_PROOF, address_proof)
+
+
+def check_address_proof(state):
+    if ADDRESS_PROOF not in state.attachments:
+        return "Please upload your proof of address before proceeding."
+
+
+# Step 11: Additional Information
+def render_additional_info():
+    st.title("> 10: Additional Information")
+
+    # Input fields keyed by their session fields
+    st.text_area("Please describe any learning preferences you have.", key="learning_preferences")
+    st.text_area("Please let us know if you have any special requirements.", key="special_requirements")
+    st.text_input("Please provide emergency contact details.", key="emergency_contact")
+    st.checkbox(
+        "I consent to the collection and processing of my personal data according to AspireCraft’s privacy policy.",
+        key="consent"
+    )
+
+    # Link to the privacy policy
+    privacy_policy_doc_link = 'https://drive.google.com/file/d/1QnmwPyUv22LPOU3eKBT1ho55QW_5_olS/view'
+    st.write(f"[Privacy Policy]({privacy_policy_doc_link})")  # Actual link to privacy policy
+
+
+# Step 12: Signature
+def render_signature():
+    st.title("> 11: Signature")
+    st.write("Please provide your signature below:")
+    from streamlit_drawable_canvas import st_canvas
+    from signature import update_signature
+
+    canvas_result = st_canvas(
+        stroke_width=2,
+        stroke_color="black",
+        background_color="white",
+        update_streamlit=True,
+        height=150,
+        width=600,
+        drawing_mode="freedraw",
+        key="signature_canvas"
+    )
+    # Only update the session state if there is a change in the canvas
+    if canvas_result.image_data is not None:
+        st.session_state.signature = update_signature(st.session_state.signature, canvas_result.image_data)
+
+
+def check_signature(state):
+    if not is_signature_drawn(state.signature):
+        return "Please provide your signature before proceeding."
+
+
+# Step 13: Final Review
+def render_review():
+    st.title("Final Review")
+    st.write("Thank you for providing your details. Please review your information and click 'Submit' to complete your enrolment.")
+
+    st.write(f"**Full Name:** {st.session_state.personal_info}")
+    dob = st.session_state.dob.strftime('%d-%m-%Y')
+    st.write(f"**Date of Birth:** {dob}")
+    st.write(f"**Gender:** {st.session_state.gender}")
+    st.write(f"**Country:** {st.session_state.country}")
+    st.write(f"**Email:** {st.session_state.email}")
+    st.write(f"**Phone:** {st.session_state.phone}")
+    st.write(f"**Address:** {st.session_state.address}")
+    st.write(f"**Previous Qualifications:** {st.session_state.previous_qualifications}")
+    st.write(f"**Current Institution:** {st.session_state.current_institution}")
+    st.write(f"**Course Interested In:** {course_info(st.session_state)}")
+
+    # st.write(f"**Learning Mode:** {st.session_state.learning_mode}")
+    st.write(f"**Learning Preferences:** {st.session_state.learning_preferences}")
+    st.write(f"**Special Requirements:** {st.session_state.special_requirements}")
+    st.write(f"**Emergency Contact:** {st.session_state.emergency_contact}")
+
+    if st.session_state.signature is not None:
+        st.image(st.session_state.signature.png, caption="Your Signature")
+
+    # Print the list of files
+    if st.session_state.attachments:
+        st.write("Files uploaded:", len(st.session_state.attachments))
+        for file in st.session_state.attachments.files():
+            st.write(f"File name: {file.name}, File type: {file.type}")
+    else:
+        st.write("No files uploaded.")
+
+
+# Form details for the submission template
+def submission_values(state):
+    return {
+        "full_name": state.personal_info,
+        "dob": state.dob.strftime('%d-%m-%Y'),
+        "gender": state.gender,
+        "country": state.country,
+        "email": state.email,
+        "phone": state.phone,
+        "address": state.address,
+        "previous_qualifications": state.previous_qualifications,
+        "current_institution": state.current_institution,
+        "course": course_info(state),
+        "learning_preferences": state.learning_preferences,
+        "special_requirements": state.special_requirements,
+        "emergency_contact": state.emergency_contact,
+    }
+
+
+# Submit, once admitted: applicants wait in line (and see their place in it) while
+# the server is busy. Returns a message instead when the submission is turned away;
+# the answers stay in the session and the draft, so pressing Submit again is enough.
+# A repeat of a recent submission (a second click, the same form filled in again)
+# does no work at all and ends on the original submission's thank-you page.
+def submit(state):
+    from admission import Overloaded, RateLimited
+    from fingerprints import submission_fingerprint
+    # Everything the applicant waits for: duplicate check, queue and processing
+    with timed("submit_seconds"):
+        form_values = submission_values(state)
+        fingerprint = submission_fingerprint(form_values, [a.sha256 for a in state.attachments.files()])
+        fingerprints = get_fingerprints()
+        original = fingerprints.lookup(fingerprint)
+        if original is not None:
+            finish_submission(state, original, duplicate=True)
+            return
+
+        ctx = get_script_run_ctx()
+        status = st.empty()
+
+        def show_position(position):
+            status.info(f"Lots of applications are arriving right now. You are number {position} in the queue, please keep this page open.")
+
+        try:
+            with get_admission().admit(email=state.email, session=ctx.session_id if ctx else None, on_wait=show_position):
+                status.empty()
+                # Claim the fingerprint; a concurrent identical submission may have been first
+                submission_id = uuid.uuid4().hex
+                owner = fingerprints.reserve(fingerprint, submission_id)
+                if owner != submission_id:
+                    finish_submission(state, owner, duplicate=True)
+                    return
+                try:
+                    process_submission(state, form_values, submission_id)
+                except Exception:
+                    fingerprints.release(fingerprint, submission_id)
+                    raise
+        except RateLimited as e:
+            status.empty()
+            minutes = max(1, round(e.retry_after / 60))
+            return f"You have already sent us several applications. Please wait about {minutes} minute(s) before submitting again."
+        except Overloaded:
+            status.empty()
+            return "We are receiving a lot of applications right now. Your answers are saved, please press Submit again in a minute."
+
+
+# Render the DOCX, queue the emails and record the submission
+def process_submission(state, form_values, submission_id):
+    from config import get_secret
+    from docx_engine import DOCX_MIME_TYPE, render_submission
+    from mailer import InMemoryFile
+    from notifications import digest_summary, submission_messages
+    with st.spinner('Processing....'), timed("submit_processing_seconds"):
+        # Signature image (PNG encoded once and cached on the Signature)
+        signature = None
+        if state.signature is not None:
+            signature = (state.signature.png, state.signature.width, state.signature.height)
+
+        # Fill the branded template in memory (no file is written to disk)
+        doc_file = InMemoryFile(
+            render_submission(form_values, signature),
+            f"ICAN_Form_Submission_{state.personal_info}.docx",
+            DOCX_MIME_TYPE,
+        )
+
+        # Sender email credentials (env / .env, falling back to st.secrets)
+        sender_email = get_secret("sender_email")
+
+        # Queue email to team with attachments and thank you email to learner;
+        # the outbox workers deliver them (with retries) after we move on
+        # Use the recompressed version of uploaded photos where one was produced
+        attachments = [image_pipeline.result(a.job, a.file) for a in state.attachments.files()]
+
+        # In digest mode the team gets this submission in the next batch instead
+        digest = get_digest()
+        messages = submission_messages(sender_email, form_values, attachments + [doc_file], team=digest is None)
+        get_outbox().enqueue(messages, submission_id=submission_id)
+        if digest is not None:
+            digest.add(submission_id, digest_summary(form_values), attachments + [doc_file])
+
+        # Keep the package on disk for staff, whatever happens to the emails
+        archive = get_archive()
+        if archive is not None:
+            archive.store(submission_id, form_values, attachments + [doc_file])
+
+        # Record the submission in the ledger (queued, written by a background thread)
+        get_ledger().record(dict(
+            form_values,
+            submission_id=submission_id,
+            attachments=", ".join(f.name for f in attachments + [doc_file]),
+        ))
+
+        finish_submission(state, submission_id)
+
+
+# Show the final thank you message (for the original submission if this was a repeat)
+def finish_submission(state, submission_id, duplicate=False):
+    state.submission_id = submission_id
+    state.duplicate_submission = duplicate
+    state.submission_done = True
+    discard_draft(state)
+
+
+# Step 14: Thank you message
+def render_thank_you():
+    st.title("Thank You!")
+    st.write("Check your email for the final boarding.")
+    if st.session_state.get("duplicate_submission"):
+        st.info("We had already received this application, so it was not sent again.")
+
+    # Delivery status of the queued emails for this submission
+    if st.session_state.get("submission_id"):
+        delivery = get_outbox().status(st.session_state.submission_id)
+        if delivery["status"] == "failed":
+            st.warning("We could not send your confirmation email. Our team has your submission and will contact you.")
+        elif delivery["status"] != "sent":
+            st.caption("Your confirmation email is on its way.")
+    st.write('')
+    st.markdown(f'<img src="{asset_url("logo")}" alt="AspireCraft" style="width:100%;">', unsafe_allow_html=True)
+
+
+STEPS = [
+    Step("welcome", render_welcome, back=False),
+    Step("personal_info", render_personal_info,
+         fields={"personal_info": ""},
+         checks=[required("personal_info", message="Please enter your full name before proceeding.")]),
+    Step("dob", render_dob,
+         fields={"dob": None},
+         checks=[required("dob", message="Please select your date of birth before proceeding.")]),
+    Step("gender", render_gender,
+         fields={"gender": PLACEHOLDER},
+         checks=[chosen("gender", message="Please select your gender before proceeding.")]),
+    Step("country", render_country,
+         fields={"country": PLACEHOLDER},
+         checks=[chosen("country", message="Please select your country before proceeding.")]),
+    Step("contact", render_contact,
+         fields={"email": "", "phone": "", "address": ""},
+         checks=[check_contact]),
+    Step("education", render_education,
+         fields={"previous_qualifications": "", "current_institution": ""},
+         checks=[required("previous_qualifications", "current_institution",
+                          message="Please list your previous qualifications and current institution before proceeding.")]),
+    Step("course", render_course,
+         fields={"subject_area": PLACEHOLDER, "sub_option": PLACEHOLDER, "learning_mode": PLACEHOLDER, "selected_course": dict},
+         checks=[chosen("subject_area", "sub_option", "learning_mode",
+                        message="Please select the subject area, course level, and learning mode before proceeding.")],
+         on_next=select_course),
+    Step("id_documents", render_id_documents,
+         checks=[check_id_documents]),
+    Step("address_proof", render_address_proof,
+         checks=[check_address_proof]),
+    Step("additional_info", render_additional_info,
+         fields={"learning_preferences": "", "special_requirements": "", "emergency_contact": "", "consent": False},
+         checks=[checked("learning_preferences", "special_requirements", "emergency_contact", "consent",
+                         message="Please complete all fields and consent before proceeding.")]),
+    Step("signature", render_signature,
+         fields={"signature": None},  # Compact Signature, see signature.py
+         checks=[check_signature]),
+    Step("review", render_review,
+         fields={"submission_done": False},
+         on_next=submit, next_label="Submit",
+         back_note="If you go back, you will have to re-sign the form."),
+    Step("thank_you", render_thank_you, next_label=None, back=False),
+]
+
+wizard = Wizard(STEPS, on_move=save_draft)
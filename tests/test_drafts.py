@@ -0,0 +1,44 @@
+import hashlib
+import os
+import time
+from attachments import Attachment
+from drafts import DraftStore
+from mailer import InMemoryFile
+
+
+class Registry:
+    def __init__(self, attachments):
+        self.attachments = attachments
+
+    def slots(self):
+        return list(self.attachments)
+
+    def get(self, slot):
+        return self.attachments[slot]
+
+
+def id_card():
+    return Attachment(InMemoryFile(b"id card scan", "id.jpg", "image/jpeg"), hashlib.sha256(b"id card scan").hexdigest())
+
+
+def test_expired_drafts_are_purged_while_the_store_is_in_use(tmp_path):
+    store = DraftStore(str(tmp_path / "drafts.sqlite3"), str(tmp_path / "blobs"), ttl=0.5, purge_interval=0.5)
+    attachment = id_card()
+    store.save("old", 1, {"full_name": "A"}, Registry({"front_id": attachment}))
+    os.utime(store.blob_path(attachment.sha256), (0, 0))  # Past the blob grace period
+    time.sleep(0.6)
+
+    store.save("new", 1, {"full_name": "B"}, Registry({}))
+    assert store.load("old") is None
+    assert not os.path.exists(store.blob_path(attachment.sha256))
+
+
+def test_delete_keeps_a_blob_that_a_concurrent_save_reuses(tmp_path):
+    store = DraftStore(str(tmp_path / "drafts.sqlite3"), str(tmp_path / "blobs"))
+    attachment = id_card()
+    store.save("first", 1, {}, Registry({"front_id": attachment}))
+    os.utime(store.blob_path(attachment.sha256), (0, 0))
+
+    store._write_blob(attachment)  # Another session saving the same file, row not yet committed
+    store.delete("first")
+    assert os.path.exists(store.blob_path(attachment.sha256))
@@ -0,0 +1,49 @@
+import os
+from openpyxl import load_workbook
+from ledger import SubmissionLedger
+
+
+def read_rows(xlsx_path):
+    sheet = load_workbook(xlsx_path).active
+    return [[(cell.value, cell.data_type) for cell in row] for row in sheet.iter_rows(min_row=2)]
+
+
+def test_values_are_written_as_text_not_formulas(tmp_path):
+    ledger = SubmissionLedger(str(tmp_path))
+    ledger.flush([{
+        "submission_id": "abc",
+        "submitted_at": "2026-10-01T09:00:00",
+        "full_name": '=HYPERLINK("http://example.com","click")',
+        "email": "+1+1",
+        "phone": "-2",
+        "address": "@SUM(A1:A2)",
+    }])
+    row = read_rows(os.path.join(tmp_path, "submissions-2026-10.xlsx"))[0]
+    values = {value: data_type for value, data_type in row if value is not None}
+    assert values['=HYPERLINK("http://example.com","click")'] == "s"
+    assert values["+1+1"] == "s"
+    assert values["-2"] == "s"
+    assert values["@SUM(A1:A2)"] == "s"
+
+
+def test_failed_workbook_is_retried_without_journaling_rows_again(tmp_path):
+    ledger = SubmissionLedger(str(tmp_path))
+    csv_path, xlsx_path = ledger.paths("2026-10")
+    os.makedirs(xlsx_path + ".tmp")  # The workbook cannot be written
+    pending = {
+        "2026-09": [{"submission_id": "a", "submitted_at": "2026-09-30T23:59:00"}],
+        "2026-10": [{"submission_id": "b", "submitted_at": "2026-10-01T00:01:00"}],
+    }
+    stale = set()
+    for _ in range(3):
+        ledger._write_pending(pending, stale)
+    assert pending == {}
+    assert stale == {"2026-10"}
+    for month in ("2026-09", "2026-10"):
+        with open(ledger.paths(month)[0], encoding="utf-8") as f:
+            assert len(f.readlines()) == 2  # Header and the row, once
+
+    os.rmdir(xlsx_path + ".tmp")
+    ledger._write_pending(pending, stale)
+    assert stale == set()
+    assert [row[0][0] for row in read_rows(xlsx_path)] == ["b"]
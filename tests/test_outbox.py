@@ -0,0 +1,53 @@
+import collections
+import threading
+import time
+from outbox import SENDING, SENT, Outbox
+
+
+class FakeMessage:
+    sender_email = "office@example.com"
+    receiver_email = ["applicant@example.com"]
+
+    def write_to(self, f):
+        f.write(b"Subject: test\r\n\r\nhello\r\n")
+
+
+def test_two_outboxes_on_one_database_deliver_each_message_once(tmp_path):
+    sent = collections.Counter()
+    lock = threading.Lock()
+
+    def send(spool_path, sender, recipients):
+        with lock:
+            sent[spool_path] += 1
+
+    db_path, spool_dir = str(tmp_path / "outbox.sqlite3"), str(tmp_path / "spool")
+    first = Outbox(db_path, spool_dir, send, workers=4)
+    second = Outbox(db_path, spool_dir, send, workers=4)
+    submission_ids = [first.enqueue([("learner", FakeMessage())]) for _ in range(200)]
+    first.start()
+    second.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and any(first.status(s)["status"] != SENT for s in submission_ids):
+        time.sleep(0.05)
+    first.stop()
+    second.stop()
+
+    assert len(sent) == 200
+    assert set(sent.values()) == {1}
+
+
+def test_message_claimed_by_a_dead_process_is_sent_after_the_claim_timeout(tmp_path):
+    sent = []
+    db_path, spool_dir = str(tmp_path / "outbox.sqlite3"), str(tmp_path / "spool")
+    dead = Outbox(db_path, spool_dir, send=None, claim_timeout=0.2)
+    submission_id = dead.enqueue([("learner", FakeMessage())])
+    assert dead._claim()[0] is not None  # Claimed, then the process "dies"
+    assert dead.status(submission_id)["messages"][0]["status"] == SENDING
+
+    live = Outbox(db_path, spool_dir, send=lambda *args: sent.append(args), claim_timeout=0.2)
+    assert live._claim() == (None, None)  # Still claimed by the other process
+    time.sleep(0.3)
+    row, _ = live._claim()
+    live._deliver(*row)
+    assert len(sent) == 1
+    assert live.status(submission_id)["status"] == SENT
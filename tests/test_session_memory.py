@@ -0,0 +1,29 @@
+import io
+import metrics
+from attachments import AttachmentRegistry
+from session_memory import MemoryGovernor
+
+
+class Upload(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+        self.type = "image/png"
+
+
+def test_per_session_figures_are_exported_as_labelled_gauges(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "_collectors", [])
+    governor = MemoryGovernor(str(tmp_path), spill_threshold=10)
+    small, large = AttachmentRegistry(), AttachmentRegistry()
+    small.put("front_id", Upload(b"tiny", "a.png"))
+    large.put("front_id", Upload(b"x" * 100, "b.png"))
+    governor.track("s-small", small)
+    governor.track("s-large", large)
+    metrics.register_collector(governor.gauges)
+
+    lines = metrics.render().splitlines()
+    assert "enrolment_sessions 2" in lines
+    assert 'enrolment_session_memory_bytes_by_session{session="s-small"} 4' in lines
+    assert 'enrolment_session_spilled_bytes_by_session{session="s-large"} 100' in lines
+    assert 'enrolment_session_evicted{session="s-large"} 0' in lines
+    assert any(line.startswith('enrolment_session_idle_seconds{session="s-small"}') for line in lines)
@@ -0,0 +1,103 @@
+"""Build the images the app serves from static/ and record them in resources/asset_manifest.json.
+
+Run from the repository root:  python tools/build_assets.py
+
+The welcome animation is transcoded from GIF to animated WebP (10 fps) and the logo and
+WhatsApp download icons are resized for their display size and saved as WebP. Every
+output is named after its content hash (welcome.<hash>.webp), so it can be cached by
+browsers forever; outputs of previous builds are removed.
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+from PIL import Image, ImageSequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assets import MANIFEST_PATH, STATIC_DIR  # noqa: E402
+
+RESOURCES = os.path.join(ROOT, "resources")
+ICON_SIZE = 200  # Icons are shown at 100x100 CSS pixels; 2x for high-density screens
+
+
+# Animated WebP at half the frame rate (every other frame shown twice as long): the
+# logo's slow zoom changes edge pixels all over the frame, so every frame costs about
+# as much as a still image and the frame count is what decides the file size
+def encode_animation(path, frame_step=2, quality=70):
+    source = Image.open(path)
+    frames = []
+    durations = []
+    for index, frame in enumerate(ImageSequence.Iterator(source)):
+        duration = frame.info.get("duration", source.info.get("duration", 100))
+        if index % frame_step == 0:
+            frames.append(frame.convert("RGB"))
+            durations.append(duration)
+        else:
+            durations[-1] += duration
+    out = io.BytesIO()
+    frames[0].save(
+        out, format="WEBP", save_all=True, append_images=frames[1:], duration=durations,
+        loop=source.info.get("loop", 0), quality=quality, method=6, minimize_size=True,
+    )
+    return out.getvalue()
+
+
+def encode_still(image, size=None, quality=90):
+    image = image.convert("RGBA")
+    if size is not None:
+        image.thumbnail((size, size), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format="WEBP", quality=quality, method=6)
+    return out.getvalue()
+
+
+def ios_icon():
+    # No iOS icon is shipped; use the Apple logo from the Mac icon's screen
+    mac = Image.open(os.path.join(RESOURCES, "icons", "macbook.png")).convert("RGBA")
+    logo = mac.crop((60, 30, 165, 120))
+    logo = logo.crop(logo.getchannel("A").getbbox())
+    side = int(max(logo.size) * 1.6)
+    icon = Image.new("RGBA", (side, side))
+    icon.alpha_composite(logo, ((side - logo.width) // 2, (side - logo.height) // 2))
+    return icon
+
+
+# Logical name -> function returning the encoded WebP bytes
+ASSETS = {
+    "welcome": lambda: encode_animation(os.path.join(RESOURCES, "AspireCraft_resized.gif")),
+    "logo": lambda: encode_still(Image.open(os.path.join(RESOURCES, "logo_org.png")), size=704),
+    "icon_android": lambda: encode_still(Image.open(os.path.join(RESOURCES, "icons", "android.png")), ICON_SIZE),
+    "icon_ios": lambda: encode_still(ios_icon(), ICON_SIZE),
+    "icon_windows": lambda: encode_still(Image.open(os.path.join(RESOURCES, "icons", "windows.png")), ICON_SIZE),
+    "icon_mac": lambda: encode_still(Image.open(os.path.join(RESOURCES, "icons", "macbook.png")), ICON_SIZE),
+}
+
+
+def main():
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    manifest = {}
+    for name, build in ASSETS.items():
+        data = build()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        file_name = f"{name}.{digest}.webp"
+        with open(os.path.join(STATIC_DIR, file_name), "wb") as f:
+            f.write(data)
+        manifest[name] = {"file": file_name, "hash": digest}
+        print(f"{file_name:<32} {len(data) / 1024:8.1f} KiB")
+
+    # Drop files from earlier builds
+    current = {entry["file"] for entry in manifest.values()}
+    for file_name in os.listdir(STATIC_DIR):
+        if file_name not in current:
+            os.remove(os.path.join(STATIC_DIR, file_name))
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Regenerate resources/submission_template.docx, the branded layout used by docx_engine.
+
+Run from the repository root:  python tools/build_docx_template.py
+
+Every value is a single run containing a {{placeholder}} so the engine can fill it
+without re-parsing the document. The signature is a placeholder picture named
+"Signature" whose image bytes and size the engine swaps per submission.
+"""
+import io
+import os
+import sys
+from docx import Document
+from docx.shared import Inches, Pt, RGBColor
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx_engine import FIELDS, SIGNATURE_NAME, TEMPLATE_PATH  # noqa: E402
+
+LOGO_PATH = os.path.join(ROOT, "resources", "logo_resized.png")
+BRAND_COLOR = RGBColor(0x2C, 0xA5, 0xA0)  # Teal from the AspireCraft logo
+
+
+def main():
+    doc = Document()
+
+    # Logo in the page header
+    header = doc.sections[0].header.paragraphs[0]
+    header.add_run().add_picture(LOGO_PATH, width=Inches(0.8))
+
+    title = doc.add_heading('Enrolment Form Submission', 0)
+    for run in title.runs:
+        run.font.color.rgb = BRAND_COLOR
+
+    # Add form details
+    for key, label in FIELDS:
+        paragraph = doc.add_paragraph()
+        label_run = paragraph.add_run(f'{label}: ')
+        label_run.bold = True
+        paragraph.add_run('{{' + key + '}}')
+
+    # Placeholder signature picture (1x1 white pixel), replaced per submission
+    doc.add_paragraph().add_run('Signature:').bold = True
+    placeholder = io.BytesIO()
+    Image.new("RGB", (1, 1), (255, 255, 255)).save(placeholder, format="PNG")
+    placeholder.seek(0)
+    shape = doc.add_picture(placeholder, width=Inches(2))
+    shape._inline.docPr.set("name", SIGNATURE_NAME)
+
+    footer = doc.sections[0].footer.paragraphs[0]
+    footer_run = footer.add_run("AspireCraft - CRAFTING SUCCESS, EMPOWERING FUTURES")
+    footer_run.font.size = Pt(8)
+    footer_run.italic = True
+
+    doc.save(TEMPLATE_PATH)
+    print(f"Wrote {TEMPLATE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
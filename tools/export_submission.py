@@ -0,0 +1,42 @@
+"""List the submissions kept in the local archive, or lay one out in a folder.
+
+Run from the repository root:
+    python tools/export_submission.py                      # list archived submissions
+    python tools/export_submission.py <submission_id> out/  # files + manifest.json into out/
+
+The files in the folder are hardlinks to the archive's blobs, so exporting a package
+costs no copying (unless the folder is on another filesystem).
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from archive import default_archive  # noqa: E402
+
+
+def main(argv):
+    archive = default_archive()
+    if not argv:
+        for submission_id in archive.submissions():
+            manifest = archive.load(submission_id)
+            name = manifest["values"].get("full_name", "")
+            print(f"{submission_id}  {name}  ({len(manifest['files'])} files)")
+        return 0
+    if len(argv) != 2:
+        print(__doc__)
+        return 2
+    submission_id, directory = argv
+    try:
+        paths = archive.export(submission_id, directory)
+    except KeyError:
+        print(f"No archived submission {submission_id}")
+        return 1
+    for path in paths:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
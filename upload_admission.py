@@ -0,0 +1,75 @@
+import hashlib
+import os
+import zipfile
+from attachments import COPY_BUFFER_SIZE
+from config import get_setting
+
+# Per-file and per-session caps on uploads (the first also caps server.maxUploadSize in
+# .streamlit/config.toml, so the browser refuses larger files before sending them)
+MAX_FILE_BYTES = int(get_setting("upload_max_mb", 10.0, float) * 1024 * 1024)
+MAX_SESSION_BYTES = int(get_setting("upload_session_max_mb", 20.0, float) * 1024 * 1024)
+
+# File types the form accepts, by their leading bytes
+JPEG = "jpg"
+PNG = "png"
+PDF = "pdf"
+DOCX = "docx"
+EXTENSIONS = {".jpg": JPEG, ".jpeg": JPEG, ".png": PNG, ".pdf": PDF, ".docx": DOCX}
+
+
+# Why an upload was refused, in words for the applicant
+class UploadRejected(Exception):
+    pass
+
+
+# The real type of a file from its first bytes, or None if it is none of the accepted ones
+def sniff(head, fileobj=None):
+    if head.startswith(b"\xff\xd8\xff"):
+        return JPEG
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return PNG
+    if head.startswith(b"%PDF-"):
+        return PDF
+    if head.startswith(b"PK\x03\x04") and fileobj is not None:
+        # A ZIP; Word documents have word/document.xml (read from the central directory only)
+        try:
+            with zipfile.ZipFile(fileobj) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return DOCX
+        except zipfile.BadZipFile:
+            pass
+        finally:
+            fileobj.seek(0)
+    return None
+
+
+# SHA-256 of a buffer, in chunks (views into the buffer, nothing is copied)
+def _sha256(view):
+    digest = hashlib.sha256()
+    for offset in range(0, len(view), COPY_BUFFER_SIZE):
+        digest.update(view[offset:offset + COPY_BUFFER_SIZE])
+    return digest.hexdigest()
+
+
+# Admit an upload into `slot`, given the session's AttachmentRegistry: the size caps
+# are checked first, then the content must match an accepted type and the extension.
+# Returns the file's SHA-256 (so the registry need not hash it again); raises
+# UploadRejected otherwise.
+def check_upload(slot, uploaded_file, attachments, max_file_bytes=MAX_FILE_BYTES, max_session_bytes=MAX_SESSION_BYTES):
+    with uploaded_file.getbuffer() as view:
+        size = view.nbytes
+        if size == 0:
+            raise UploadRejected(f"{uploaded_file.name} is empty.")
+        if size > max_file_bytes:
+            raise UploadRejected(f"{uploaded_file.name} is larger than {max_file_bytes // (1024 * 1024)} MB.")
+        # What the session holds in the other slots (shared files counted once)
+        others = {a.sha256: a.size for a in map(attachments.get, attachments.slots()) if a is not attachments.get(slot)}
+        if sum(others.values()) + size > max_session_bytes:
+            raise UploadRejected(f"Your documents may not be larger than {max_session_bytes // (1024 * 1024)} MB together.")
+
+        kind = sniff(bytes(view[:8]), uploaded_file)
+        if kind is None:
+            raise UploadRejected(f"{uploaded_file.name} is not a JPG, PNG, PDF or Word (DOCX) file.")
+        if EXTENSIONS.get(os.path.splitext(uploaded_file.name)[1].lower()) != kind:
+            raise UploadRejected(f"{uploaded_file.name} is really a {kind.upper()} file; please upload it with the right extension.")
+        return _sha256(view)
@@ -0,0 +1,55 @@
+import re
+from dialing_codes import code_digits
+from reference_data import get_reference_data
+
+# Comprehensive regex for email validation (compiled once)
+EMAIL_PATTERN = re.compile(r'''
+    ^                         # Start of string
+    (?!.*[._%+-]{2})          # No consecutive special characters
+    [a-zA-Z0-9._%+-]{1,64}    # Local part: allowed characters and length limit
+    (?<![._%+-])              # No special characters at the end of local part
+    @                         # "@" symbol
+    [a-zA-Z0-9.-]+            # Domain part: allowed characters
+    (?<![.-])                 # No special characters at the end of domain
+    \.[a-zA-Z]{2,}$           # Top-level domain with minimum 2 characters
+''', re.VERBOSE)
+
+# Remove all spaces and dashes from the phone number
+def normalize_phone(phone):
+    return phone.replace(" ", "").replace("-", "")
+
+
+# Function to validate the phone number against the selected country's dialing code
+# and that code's national number length (see resources/phone_number_lengths.json)
+def validate_phone_number(phone, dialing_code, dialing_codes=None):
+    dialing_codes = dialing_codes or get_reference_data().dialing_codes
+    phone = normalize_phone(phone)
+    digits = code_digits(dialing_code or "")
+    if not digits:
+        # Unknown country: without a code any +digits number would pass below
+        return False, "Please select your country so the phone number's dialing code can be checked."
+    prefix = "+" + digits  # "+1-242" is dialled as +1242
+
+    # Check if the phone number starts with the correct dialing code
+    if not phone.startswith(prefix):
+        return False, f"Phone number must start with {prefix}."
+
+    # Extract the number part (remove the dialing code)
+    number_without_code = phone[len(prefix):]
+
+    # Ensure the number part contains only digits and has a valid length for the country
+    if not number_without_code.isdigit():
+        return False, "Phone number must contain only digits after the dialing code."
+
+    min_digits, max_digits = dialing_codes.length_rule(dialing_code)
+    if not (min_digits <= len(number_without_code) <= max_digits):
+        if min_digits == max_digits:
+            return False, f"Phone numbers starting with {prefix} must have {min_digits} digits after the dialing code."
+        return False, f"Phone numbers starting with {prefix} must have between {min_digits} and {max_digits} digits after the dialing code."
+
+    return True, ""
+
+
+def is_valid_email(email):
+    # Match the entire email against the pattern
+    return EMAIL_PATTERN.match(email) is not None
@@ -0,0 +1,132 @@
+import streamlit as st
+from metrics import timed
+
+
+# One page of the form. The step declares its session fields (with defaults), how to
+# draw it, the checks that must pass before moving on and what happens on Next. Checks
+# take the session state and return an error message, or None when the step is valid;
+# on_next may return a message too, to stay on the step (e.g. Submit turned away).
+class Step:
+    def __init__(self, name, render, fields=None, checks=(), on_next=None,
+                 next_label="Next", back=True, back_note=None):
+        self.name = name
+        self.render = render
+        self.fields = fields or {}
+        self.checks = tuple(checks)
+        self.on_next = on_next
+        self.next_label = next_label  # None: no Next button (last page)
+        self.back = back
+        self.back_note = back_note  # Shown above the Back button
+
+    def validate(self, state):
+        for check in self.checks:
+            message = check(state)
+            if message:
+                return message
+        return None
+
+
+# Check factories, built once when the step registry is defined
+def required(*fields, message):
+    def check(state):
+        if not all(str(state.get(field) or "").strip() for field in fields):
+            return message
+    return check
+
+
+def chosen(*fields, message, placeholder="Select"):
+    def check(state):
+        if any(state.get(field) in (None, "", placeholder) for field in fields):
+            return message
+    return check
+
+
+def checked(*fields, message):
+    def check(state):
+        if not all(state.get(field) for field in fields):
+            return message
+    return check
+
+
+# Step bodies run as a fragment: interacting with a step's widgets reruns only this
+# function, not app.py (page setup, progress bar) or the navigation buttons
+@st.experimental_fragment
+def _render_fragment(name, render):
+    with timed("step_render_seconds", step=name):
+        render()
+
+
+# Runs a list of steps: st.session_state.step is the 1-based position of the active
+# step, transitions go to the neighbouring entries of the list, and only the active
+# step is rendered and validated on a rerun. Next/Back are handled in on_click
+# callbacks, which run before the rerun the click triggers, so moving between steps
+# costs a single script run. `on_move(state)` is called after every change of step.
+class Wizard:
+    def __init__(self, steps, on_move=None):
+        self.steps = list(steps)
+        self.on_move = on_move
+
+    def __len__(self):
+        return len(self.steps)
+
+    def init_state(self, state):
+        if 'step' not in state:
+            state.step = 1
+        for step in self.steps:
+            for field, default in step.fields.items():
+                if field not in state:
+                    state[field] = default() if callable(default) else default
+                else:
+                    # Streamlit drops the state of widgets that are not on screen;
+                    # re-assigning keeps the values entered on other steps
+                    state[field] = state[field]
+
+    # Names of the session fields declared by the steps
+    def fields(self):
+        return [field for step in self.steps for field in step.fields]
+
+    def current(self, state):
+        return self.steps[state.step - 1]
+
+    def progress(self, state):
+        return int(state.step / len(self.steps) * 100)
+
+    def go_next(self):
+        state = st.session_state
+        step = self.current(state)
+        message = step.validate(state)
+        if message:
+            state.step_warning = message
+            return
+        if step.on_next is not None:
+            message = step.on_next(state)
+            if message:
+                state.step_warning = message
+                return
+        state.step += 1
+        self._moved(state)
+
+    def go_back(self):
+        st.session_state.step -= 1
+        self._moved(st.session_state)
+
+    def _moved(self, state):
+        if self.on_move is not None:
+            self.on_move(state)
+
+    def run(self):
+        state = st.session_state
+        step = self.current(state)
+        _render_fragment(step.name, step.render)
+
+        if step.next_label:
+            st.button(step.next_label, key=f"next_{state.step}", on_click=self.go_next)
+        if step.back_note:
+            st.info(step.back_note)
+        if step.back:
+            st.button("Back", key=f"back_{state.step}", on_click=self.go_back)
+
+        # Message left by a Next click that did not pass the step's checks
+        warning = state.pop("step_warning", None)
+        if warning:
+            st.warning(warning)